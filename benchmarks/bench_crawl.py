@@ -0,0 +1,71 @@
+"""Пропускная способность обхода ссылок на синтетическом графе страниц.
+
+Каждая страница ссылается на fanout других страниц графа и на адрес вне
+папки обхода, уровни глубины загружаются движком run_engine. Выводится
+число страниц в секунду для разного числа потоков загрузки.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_crawl.py --pages 3000 --fanout 8 --delay 0.005
+"""
+import random
+import time
+from argparse import Namespace
+
+from common import argument_parser
+
+from requests_cache import CachedSession
+
+from crawler import crawl
+from extractors import page_links
+from tests.fixture_data.server import serve
+
+ROW = ('workers={workers:<4} pages={pages:<6} '
+       '{elapsed:8.3f} s {rate:9.1f} pages/s')
+
+
+def link_graph(pages, fanout, seed=0):
+    rng = random.Random(seed)
+    graph = {}
+    for page in range(pages):
+        targets = [0] + rng.sample(range(pages), min(fanout, pages))
+        graph[f'/site/{page}.html'] = ''.join(
+            f'<li><a href="{target}.html">{target}</a></li>'
+            for target in targets
+        ).encode() + b'<a href="/elsewhere/">x</a>'
+    graph['/site/'] = graph['/site/0.html']
+    return graph
+
+
+def visit_links(response, depth, follow):
+    links = page_links(response.content, response.encoding) if follow else []
+    return depth, links
+
+
+def bench(graph, workers, delay, depth):
+    with serve(graph, delay) as url:
+        start = time.perf_counter()
+        pages = sum(1 for _ in crawl(
+            CachedSession(backend='memory'), url + 'site/', visit_links,
+            max_depth=depth, cli_args=Namespace(workers=workers)
+        ))
+        return pages, time.perf_counter() - start
+
+
+def run():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--pages', type=int, default=3000)
+    parser.add_argument('--fanout', type=int, default=8)
+    parser.add_argument('--depth', type=int, default=10)
+    parser.add_argument('--delay', type=float, default=0.005)
+    args = parser.parse_args()
+    graph = link_graph(args.pages, args.fanout)
+    for workers in (1, 4, 10):
+        pages, elapsed = bench(graph, workers, args.delay, args.depth)
+        print(ROW.format(
+            workers=workers, pages=pages, elapsed=elapsed,
+            rate=pages / elapsed,
+        ))
+
+
+if __name__ == '__main__':
+    run()
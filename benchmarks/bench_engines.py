@@ -0,0 +1,39 @@
+"""Загрузка карточек PEP при разном числе потоков на локальном стенде.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_engines.py --count 300 --delay 0.02
+"""
+import time
+from argparse import Namespace
+
+from common import argument_parser
+
+from requests_cache import CachedSession
+
+import main
+from tests.fixture_data.server import pep_pages, serve
+
+ROW = 'workers={workers:<4} {elapsed:8.3f} s'
+
+
+def bench(workers, count, delay):
+    with serve(pep_pages(count), delay) as url:
+        main.PEP_DOC_URL = url
+        session = CachedSession(backend='memory')
+        start = time.perf_counter()
+        main.pep(session, Namespace(workers=workers))
+        return time.perf_counter() - start
+
+
+def run():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--count', type=int, default=300)
+    parser.add_argument('--delay', type=float, default=0.02)
+    args = parser.parse_args()
+    for workers in (1, 4, 10):
+        elapsed = bench(workers, args.count, args.delay)
+        print(ROW.format(workers=workers, elapsed=elapsed))
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,97 @@
+"""Время и пиковая память разбора одной страницы: BeautifulSoup и lxml.
+
+Пиковая память считается через tracemalloc и учитывает только
+Python-объекты: память libxml2 под дерево lxml в неё не попадает.
+Индекс PEP по умолчанию размером с настоящую страницу PEP 0: около
+750 строк в числовом индексе и столько же в разделах по категориям.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_extractors.py --pages 200 --paragraphs 400 \
+        --index-peps 750
+"""
+import time
+import tracemalloc
+
+from common import argument_parser
+
+from bs4 import BeautifulSoup
+
+from extractors import (
+    pep_card_status, pep_index_records, whats_new_record
+)
+from tests.fixture_data.pages import (
+    pep_card_page, pep_index_page, whats_new_page
+)
+from utils import find_tag
+
+ROW = '{name:<22} {per_page:8.3f} ms/page {peak:10.1f} KiB peak'
+
+
+def soup_pep(content):
+    return find_tag(BeautifulSoup(content, 'lxml'), 'abbr').text
+
+
+def soup_whats_new(content):
+    soup = BeautifulSoup(content, 'lxml')
+    return (
+        find_tag(soup, 'h1').text,
+        find_tag(soup, 'dl').text.replace('\n', ' '),
+    )
+
+
+def soup_pep_index(content):
+    soup = BeautifulSoup(content, 'lxml')
+    numerical_index = find_tag(soup, 'section', {'id': 'numerical-index'})
+    return [
+        (
+            find_tag(tr, 'a', {'class': 'pep reference internal'}).text,
+            find_tag(tr, 'abbr').text[1:],
+        )
+        for tr in numerical_index.find_all('tr')[1:]
+    ]
+
+
+def measure(func, pages):
+    start = time.perf_counter()
+    for page in pages:
+        func(page)
+    per_page = (time.perf_counter() - start) / len(pages) * 1000
+    tracemalloc.start()
+    func(pages[0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return per_page, peak / 1024
+
+
+def run():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--paragraphs', type=int, default=400)
+    parser.add_argument('--index-peps', type=int, default=750)
+    parser.add_argument('--index-pages', type=int, default=10)
+    args = parser.parse_args()
+    cards = [
+        pep_card_page(number, 'Final', args.paragraphs).encode()
+        for number in range(args.pages)
+    ]
+    notes = [
+        whats_new_page(f'3.{number}', args.paragraphs).encode()
+        for number in range(args.pages)
+    ]
+    indexes = [
+        pep_index_page(args.index_peps, categories=1).encode()
+    ] * args.index_pages
+    for name, func, pages in (
+        ('pep: soup', soup_pep, cards),
+        ('pep: lxml', pep_card_status, cards),
+        ('whats-new: soup', soup_whats_new, notes),
+        ('whats-new: lxml', whats_new_record, notes),
+        ('pep index: soup', soup_pep_index, indexes),
+        ('pep index: lxml', pep_index_records, indexes),
+    ):
+        per_page, peak = measure(func, pages)
+        print(ROW.format(name=name, per_page=per_page, peak=peak))
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,139 @@
+"""Сквозной бенчмарк четырёх режимов парсера на локальном стенде.
+
+Каждый режим запускается дважды на одной сессии с SQLite-кешем: сначала
+с пустым кешем (cold), затем с прогретым (warm). Строка batch/cold -
+все режимы одним запуском main.run_modes с общей сессией и пустым кешем.
+Результаты сохраняются в benchmarks/results/ и сравниваются с предыдущим
+запуском. С --parse-procs извлечение данных из страниц идёт в пуле
+процессов; на прогретом кеше это показывает масштабирование по ядрам.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_modes.py --peps 300 --delay 0.01 --workers 8
+    python benchmarks/bench_modes.py --workers 8 --parse-procs 4
+    python benchmarks/bench_modes.py --corpus benchmarks/corpus.json.gz
+"""
+import datetime as dt
+import json
+import platform
+import tempfile
+import time
+from argparse import Namespace
+from pathlib import Path
+
+from common import argument_parser
+from corpus import DOCS_PREFIX, PEPS_PREFIX, load_corpus, synthetic_corpus
+
+from requests_cache import CachedSession
+
+import main
+import outputs
+from tests.fixture_data.server import serve
+
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+MODES = ('whats-new', 'latest-versions', 'pep', 'download')
+CACHE_STATES = ('cold', 'warm')
+ROW = '{name:<24} {elapsed:8.3f} s {delta}'
+DELTA = '({change:+.1f}% к {previous})'
+
+
+def bench_mode(mode, url, work_dir, cli_args):
+    main.MAIN_DOC_URL = url + DOCS_PREFIX[1:]
+    main.PEP_DOC_URL = url + PEPS_PREFIX[1:]
+    main.BASE_DIR = work_dir
+    session = CachedSession(str(work_dir / f'{mode}_cache'))
+    session.parse_pool = main.open_parse_pool(cli_args.parse_procs)
+    timings = {}
+    for cache_state in CACHE_STATES:
+        start = time.perf_counter()
+        main.MODE_TO_FUNCTION[mode](session, cli_args)
+        timings[cache_state] = time.perf_counter() - start
+        for archive in (work_dir / 'downloads').glob('*'):
+            archive.unlink()
+    if session.parse_pool is not None:
+        session.parse_pool.shutdown()
+    return timings
+
+
+def bench_batch(url, work_dir, args):
+    main.MAIN_DOC_URL = url + DOCS_PREFIX[1:]
+    main.PEP_DOC_URL = url + PEPS_PREFIX[1:]
+    main.BASE_DIR = work_dir
+    outputs.BASE_DIR = work_dir
+    session = CachedSession(str(work_dir / 'batch_cache'))
+    start = time.perf_counter()
+    main.run_modes(session, Namespace(
+        mode=list(MODES), output='jsonl',
+        workers=args.workers,
+    ))
+    return time.perf_counter() - start
+
+
+def run_benchmarks(corpus, args):
+    cli_args = Namespace(
+        workers=args.workers, parse_procs=args.parse_procs,
+    )
+    results = {}
+    with serve(corpus, args.delay) as url:
+        for mode in MODES:
+            with tempfile.TemporaryDirectory() as work_dir:
+                timings = bench_mode(mode, url, Path(work_dir), cli_args)
+            for cache_state, elapsed in timings.items():
+                results[f'{mode}/{cache_state}'] = elapsed
+        with tempfile.TemporaryDirectory() as work_dir:
+            results['batch/cold'] = bench_batch(url, Path(work_dir), args)
+    return results
+
+
+def previous_run():
+    runs = sorted(RESULTS_DIR.glob('*.json'))
+    if not runs:
+        return None, {}
+    with open(runs[-1], encoding='utf-8') as f:
+        return runs[-1].name, json.load(f)['results']
+
+
+def save_run(results, args):
+    RESULTS_DIR.mkdir(exist_ok=True)
+    file_path = RESULTS_DIR / (
+        f'{dt.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")}.json'
+    )
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'options': {
+                key: str(value) for key, value in vars(args).items()
+            },
+            'results': results,
+        }, f, indent=2)
+    return file_path
+
+
+def run():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--corpus', type=Path)
+    parser.add_argument('--peps', type=int, default=300)
+    parser.add_argument('--delay', type=float, default=0.01)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--parse-procs', type=int)
+    args = parser.parse_args()
+    corpus = (
+        load_corpus(args.corpus) if args.corpus
+        else synthetic_corpus(args.peps)
+    )
+    previous_name, previous = previous_run()
+    results = run_benchmarks(corpus, args)
+    for name, elapsed in results.items():
+        delta = ''
+        if previous.get(name):
+            delta = DELTA.format(
+                change=(elapsed / previous[name] - 1) * 100,
+                previous=previous_name
+            )
+        print(ROW.format(name=name, elapsed=elapsed, delta=delta))
+    print(f'Результаты сохранены: {save_run(results, args)}')
+
+
+if __name__ == '__main__':
+    run()
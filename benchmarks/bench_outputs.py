@@ -0,0 +1,87 @@
+"""Запись и чтение большой таблицы результатов: CSV, JSON Lines, колонки.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_outputs.py --rows 200000
+"""
+import csv
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from common import argument_parser
+
+from columnar import (
+    columnar_extension, read_columnar, write_columnar
+)
+
+ROW = '{name:<10} write {write:7.3f} s  read {read:7.3f} s  {size:8.1f} KiB'
+
+
+def synthetic_results(rows):
+    return [
+        ('Ссылка на статью', 'Версия', 'Количество'),
+        *(
+            (f'https://peps.python.org/pep-{number:04d}/', 'Final', number)
+            for number in range(rows)
+        ),
+    ]
+
+
+def write_csv(path, results):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        csv.writer(f).writerows(results)
+
+
+def read_csv(path):
+    with open(path, encoding='utf-8', newline='') as f:
+        header, *rows = csv.reader(f)
+    return [tuple(header), *(
+        (link, version, int(count)) for link, version, count in rows
+    )]
+
+
+def write_jsonl(path, results):
+    header, *rows = results
+    with open(path, 'w', encoding='utf-8') as f:
+        for row in rows:
+            f.write(json.dumps(dict(zip(header, row)), ensure_ascii=False))
+            f.write('\n')
+
+
+def read_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        return [tuple(json.loads(line).values()) for line in f]
+
+
+def measure(path, results, write, read):
+    start = time.perf_counter()
+    write(path, results)
+    written = time.perf_counter() - start
+    start = time.perf_counter()
+    read(path)
+    return written, time.perf_counter() - start, path.stat().st_size / 1024
+
+
+def run():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--rows', type=int, default=200000)
+    args = parser.parse_args()
+    results = synthetic_results(args.rows)
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        for name, extension, write, read in (
+            ('csv', 'csv', write_csv, read_csv),
+            ('jsonl', 'jsonl', write_jsonl, read_jsonl),
+            ('columnar', columnar_extension(), write_columnar, read_columnar),
+        ):
+            written, read_time, size = measure(
+                directory / f'results.{extension}', results, write, read
+            )
+            print(ROW.format(
+                name=name, write=written, read=read_time, size=size
+            ))
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,58 @@
+"""Переиспользование соединений и пропускная способность пула.
+
+Для каждого числа потоков считается, сколько TCP-соединений открыл стенд
+на все запросы. Доля переиспользования равна 1 - соединения / запросы.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_pool.py --count 300 --delay 0.005
+"""
+import time
+from argparse import Namespace
+
+from common import argument_parser
+
+from configs import configure_session
+from engines import sync_map
+from tests.fixture_data.server import pep_pages, serve
+from utils import get_response
+
+ROW = (
+    'workers={workers:<4} pool={pool:<4} {rate:8.1f} req/s '
+    'connections={connections:<5} reuse={reuse:6.1%}'
+)
+
+
+def bench(pages, delay, workers, pool_size):
+    connections = []
+    session = configure_session(
+        Namespace(host_connections=workers, pool_size=pool_size),
+        backend='memory'
+    )
+    with serve(pages, delay, connections=connections) as url:
+        urls = [url + path[1:] for path in pages]
+        start = time.perf_counter()
+        list(sync_map(lambda page: get_response(session, page), urls, workers))
+        elapsed = time.perf_counter() - start
+    reuse = 1 - len(connections) / len(urls)
+    return len(urls) / elapsed, len(connections), reuse
+
+
+def run():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--count', type=int, default=300)
+    parser.add_argument('--delay', type=float, default=0.005)
+    args = parser.parse_args()
+    pages = pep_pages(args.count)
+    for workers in (1, 4, 16, 64):
+        for pool_size in sorted({10, workers}):
+            rate, connections, reuse = bench(
+                pages, args.delay, workers, pool_size
+            )
+            print(ROW.format(
+                workers=workers, pool=pool_size, rate=rate,
+                connections=connections, reuse=reuse
+            ))
+
+
+if __name__ == '__main__':
+    run()
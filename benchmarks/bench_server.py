@@ -0,0 +1,97 @@
+"""Задержка запроса к серверу парсера против запуска main.py на каждый запрос.
+
+Для каждого режима сравниваются отдельный процесс с холодной сессией и
+запрос к серверу с прогретой сессией и кешем разобранных страниц. Оба
+варианта читают синтетические страницы из снимка, сеть не участвует.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_server.py --peps 300 --repeat 20
+"""
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from argparse import Namespace
+from pathlib import Path
+
+from common import argument_parser, BASE_DIR
+
+import main
+from configs import configure_session
+from constants import MAIN_DOC_URL, PEP_DOC_URL
+from server import create_server, query_server
+from snapshot import SnapshotWriter
+from tests.fixture_data.server import site_pages
+
+MODES = ('whats-new', 'latest-versions', 'pep')
+ROW = '{mode:<16} cli {cli:9.1f} ms  server {server:9.3f} ms'
+
+
+def build_snapshot(pages, path):
+    with SnapshotWriter(path) as writer:
+        for page, body in pages.items():
+            for prefix, base_url in (
+                ('/docs/3/', MAIN_DOC_URL), ('/peps/', PEP_DOC_URL)
+            ):
+                if page.startswith(prefix):
+                    writer.add(
+                        base_url + page[len(prefix):], 200, {}, [body]
+                    )
+    return path
+
+
+def cli_latency(mode, snapshot_path, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, str(BASE_DIR / 'src' / 'main.py'), mode,
+             '--from-snapshot', str(snapshot_path)],
+            check=True, capture_output=True,
+        )
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def server_latency(mode, server_url, repeat):
+    cli_args = Namespace(mode=mode, parsed_cache_size=10000)
+    query_server(server_url, cli_args)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        query_server(server_url, cli_args)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def run():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--peps', type=int, default=300)
+    parser.add_argument('--versions', type=int, default=15)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as work_dir:
+        snapshot_path = build_snapshot(
+            site_pages(args.peps, args.versions),
+            Path(work_dir) / 'docs.snapshot'
+        )
+        server = create_server(
+            configure_session(Namespace(from_snapshot=snapshot_path)),
+            main.MODE_TO_ROWS, port=0,
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        server_url = f'http://127.0.0.1:{server.server_port}/'
+        for mode in MODES:
+            print(ROW.format(
+                mode=mode,
+                cli=cli_latency(mode, snapshot_path, max(args.repeat // 5, 1)),
+                server=server_latency(mode, server_url, args.repeat),
+            ))
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,72 @@
+"""Время запуска: импорт main и вызов main.py --help.
+
+Импорт замеряется через python -X importtime, выводятся медиана
+накопленного времени импорта main и самые долгие модули по собственному
+времени. Для --help замеряется полное время работы процесса.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_startup.py --repeat 20 --top 15
+"""
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from common import argument_parser, SRC_DIR
+
+ROW = '{name:<40} {elapsed:8.2f} ms'
+
+
+def import_times(*args):
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', *args],
+        cwd=SRC_DIR, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '[us]' in line:
+            continue
+        self_time, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(self_time) / 1000, int(cumulative) / 1000)
+    return times
+
+
+def help_time():
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, 'main.py', '--help'],
+        cwd=SRC_DIR, capture_output=True, check=True,
+    )
+    return (time.perf_counter() - start) * 1000
+
+
+def run():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+    self_times = defaultdict(list)
+    main_times = []
+    for _ in range(args.repeat):
+        times = import_times('-c', 'import main')
+        main_times.append(times['main'][1])
+        for name, (self_time, _) in times.items():
+            self_times[name].append(self_time)
+    print(ROW.format(
+        name='import main', elapsed=statistics.median(main_times)
+    ))
+    print(ROW.format(
+        name='main.py --help',
+        elapsed=statistics.median(help_time() for _ in range(args.repeat))
+    ))
+    print()
+    slowest = sorted(
+        self_times.items(), key=lambda item: -statistics.median(item[1])
+    )
+    for name, timings in slowest[:args.top]:
+        print(ROW.format(name=name, elapsed=statistics.median(timings)))
+
+
+if __name__ == '__main__':
+    run()
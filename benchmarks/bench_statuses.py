@@ -0,0 +1,69 @@
+"""Сверка статусов PEP: построчное сравнение строк против пакетной сверки.
+
+Построчный вариант повторяет прежний pep: разбор title индекса и
+сравнение со статусом карточки для каждой строки. Пакетный сверяет
+готовые колонки строк индекса и статусов карточек через reconcile.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_statuses.py --rows 100000 --repeat 5
+"""
+import statistics
+import time
+from collections import defaultdict
+
+from common import argument_parser
+
+from main import PepRow
+from statuses import reconcile
+from tests.fixture_data.pages import PEP_STATUSES
+
+ROW = '{name:<10} {elapsed:9.2f} ms'
+
+
+def make_rows(count):
+    rows, titles, statuses = [], [], []
+    for number in range(count):
+        abbr, title, status = PEP_STATUSES[number % len(PEP_STATUSES)]
+        rows.append(PepRow(number, abbr[1:], f'pep-{number:04d}/', ''))
+        titles.append(title)
+        statuses.append(status)
+    return rows, titles, statuses
+
+
+def per_row(rows, titles, statuses):
+    counts = defaultdict(int)
+    mismatches = []
+    for row, title, status in zip(rows, titles, statuses):
+        counts[status] += 1
+        if status != title.split(', ')[1]:
+            mismatches.append(row.number)
+    return counts, mismatches
+
+
+def batched(rows, titles, statuses):
+    return reconcile(rows, statuses)
+
+
+def measure(function, columns, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*columns)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def run():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    columns = make_rows(args.rows)
+    for name, function in (('per-row', per_row), ('batched', batched)):
+        print(ROW.format(
+            name=name, elapsed=measure(function, columns, args.repeat)
+        ))
+
+
+if __name__ == '__main__':
+    run()
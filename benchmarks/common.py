@@ -0,0 +1,24 @@
+"""Общее для скриптов бенчмарков.
+
+Модуль импортируется первым: он добавляет в sys.path корень репозитория и
+папку src, чтобы следующие импорты нашли модули парсера и тестовые
+страницы.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+SRC_DIR = BASE_DIR / 'src'
+
+for path in (BASE_DIR, SRC_DIR):
+    if str(path) not in sys.path:
+        sys.path.append(str(path))
+
+
+def argument_parser(description):
+    """Парсер аргументов, который показывает в --help описание скрипта."""
+    return argparse.ArgumentParser(
+        description=description,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
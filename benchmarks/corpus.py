@@ -0,0 +1,107 @@
+"""Корпус страниц для бенчмарков: синтетический или записанный с сайтов.
+
+Корпус - это словарь {путь на стенде: тело ответа}. Страницы документации
+лежат под /docs/3/, страницы PEP - под /peps/, поэтому стенд подменяет
+MAIN_DOC_URL и PEP_DOC_URL одним локальным сервером.
+
+Записать корпус с docs.python.org и peps.python.org:
+    python benchmarks/corpus.py --output benchmarks/corpus.json.gz
+"""
+import gzip
+import json
+import tempfile
+from argparse import Namespace
+from pathlib import Path
+
+from common import argument_parser
+
+from requests_cache import CachedSession
+
+import main
+from constants import MAIN_DOC_URL, PEP_DOC_URL
+from tests.fixture_data.pages import (
+    docs_index_page, download_page, DOCS_ARCHIVES, pep_card_page,
+    pep_index_page, pep_rows, whats_new_index_page, whats_new_page,
+    whats_new_versions
+)
+
+DOCS_PREFIX = '/docs/3/'
+PEPS_PREFIX = '/peps/'
+RECORDED_MODES = ('whats-new', 'latest-versions', 'pep', 'download')
+
+
+def synthetic_corpus(peps=300, versions=15, archive_size=8 * 1024 * 1024):
+    corpus = {
+        DOCS_PREFIX: docs_index_page().encode(),
+        DOCS_PREFIX + 'whatsnew/': whats_new_index_page(
+            whats_new_versions(versions)
+        ).encode(),
+        DOCS_PREFIX + 'download.html': download_page().encode(),
+        PEPS_PREFIX: pep_index_page(peps).encode(),
+    }
+    for version in whats_new_versions(versions):
+        corpus[f'{DOCS_PREFIX}whatsnew/{version}.html'] = whats_new_page(
+            version, paragraphs=300
+        ).encode()
+    for number, _, _, status in pep_rows(peps):
+        corpus[f'{PEPS_PREFIX}pep-{number:04d}/'] = pep_card_page(
+            number, status, paragraphs=400
+        ).encode()
+    corpus[f'{DOCS_PREFIX}archives/{DOCS_ARCHIVES[0]}'] = bytes(
+        index % 251 for index in range(archive_size)
+    )
+    return corpus
+
+
+def corpus_path(url):
+    for prefix, path in (
+        (MAIN_DOC_URL, DOCS_PREFIX), (PEP_DOC_URL, PEPS_PREFIX)
+    ):
+        if url.startswith(prefix):
+            return path + url[len(prefix):]
+    return None
+
+
+def record_corpus(tmp_dir):
+    corpus = {}
+
+    def record(response, *args, **kwargs):
+        path = corpus_path(response.url)
+        if path is not None and response.ok:
+            corpus[path] = response.content
+        return response
+
+    session = CachedSession(backend='memory')
+    session.hooks['response'].append(record)
+    main.BASE_DIR = tmp_dir
+    for mode in RECORDED_MODES:
+        main.MODE_TO_FUNCTION[mode](session, Namespace(workers=8))
+    return corpus
+
+
+def save_corpus(corpus, path):
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        json.dump(
+            {key: body.decode('latin-1') for key, body in corpus.items()}, f
+        )
+
+
+def load_corpus(path):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return {
+            key: body.encode('latin-1') for key, body in json.load(f).items()
+        }
+
+
+def run():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--output', type=Path, required=True)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus = record_corpus(Path(tmp_dir))
+    save_corpus(corpus, args.output)
+    print(f'{len(corpus)} страниц сохранено в {args.output}')
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,208 @@
+import hashlib
+import os
+import re
+from threading import Lock, Semaphore
+from urllib.parse import urlsplit
+
+from constants import ARCHIVE_FORMATS, CHUNK_SIZE, HOST_CONNECTIONS
+
+NO_STORE = {'Cache-Control': 'no-store'}
+PARTIAL_CONTENT = 206
+RANGE_NOT_SATISFIABLE = 416
+CHECKSUM_LINE = '{checksum}  {name}\n'
+CONTENT_RANGE = re.compile(r'bytes (\d+)-\d+/(\d+|\*)')
+DOWNLOAD_ATTEMPTS = 2
+ARCHIVE_INCOMPLETE = 'Архив {url} загружен не полностью'
+
+host_semaphores = {}
+host_semaphores_lock = Lock()
+
+
+def archive_file(downloads_dir, url):
+    return downloads_dir / url.split('/')[-1]
+
+
+def partial_path(path):
+    return path.with_name(path.name + '.part')
+
+
+def checksum_path(path):
+    return path.with_name(path.name + '.sha256')
+
+
+def validator_path(path):
+    return path.with_name(path.name + '.part.validator')
+
+
+def discard_partial(path):
+    partial_path(path).unlink(missing_ok=True)
+    validator_path(path).unlink(missing_ok=True)
+
+
+def response_validator(response):
+    """ETag или Last-Modified, годные для If-Range: слабый ETag не годится."""
+    etag = response.headers.get('ETag')
+    if etag and not etag.startswith('W/'):
+        return etag
+    return response.headers.get('Last-Modified')
+
+
+def resume_point(path):
+    """Смещение и валидатор для продолжения загрузки.
+
+    Без сохранённого валидатора нельзя проверить, что .part — начало той
+    же версии архива, поэтому такой .part удаляется.
+    """
+    part_path, saved_path = partial_path(path), validator_path(path)
+    offset = part_path.stat().st_size if part_path.exists() else 0
+    validator = saved_path.read_text() if saved_path.exists() else None
+    if offset and not validator:
+        discard_partial(path)
+        return 0, None
+    return offset, validator
+
+
+def expected_size(response):
+    """Полный размер архива и начало присланного куска."""
+    if response.status_code == PARTIAL_CONTENT:
+        match = CONTENT_RANGE.fullmatch(
+            response.headers.get('Content-Range', '')
+        )
+        if match is None:
+            return None, None
+        start, total = match.groups()
+        return None if total == '*' else int(total), int(start)
+    size = response.headers.get('Content-Length')
+    if size is None or 'Content-Encoding' in response.headers:
+        return None, 0
+    return int(size), 0
+
+
+def hash_file(path, chunk_size=CHUNK_SIZE):
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            sha256.update(chunk)
+    return sha256
+
+
+def write_chunks(response, part_path, offset, chunk_size=CHUNK_SIZE):
+    from tqdm import tqdm
+    response.raise_for_status()
+    if response.status_code != PARTIAL_CONTENT:
+        offset = 0
+    sha256 = hash_file(part_path, chunk_size) if offset else hashlib.sha256()
+    total = int(response.headers.get('Content-Length', 0)) + offset
+    with open(part_path, 'ab' if offset else 'wb') as f, tqdm(
+        total=total or None, initial=offset,
+        unit='B', unit_scale=True, desc=part_path.stem
+    ) as progress:
+        for chunk in response.iter_content(chunk_size):
+            f.write(chunk)
+            sha256.update(chunk)
+            progress.update(len(chunk))
+    return sha256
+
+
+def stream_download(session, url, path, chunk_size=CHUNK_SIZE):
+    """Загрузка архива в .part с продолжением с места остановки.
+
+    Продолжение запрашивается с If-Range: если архив на сервере сменился,
+    сервер пришлёт его целиком. На 416, чужое начало куска или размер,
+    не совпавший с заявленным, .part удаляется и архив загружается с нуля.
+    """
+    part_path = partial_path(path)
+    for _ in range(DOWNLOAD_ATTEMPTS):
+        offset, validator = resume_point(path)
+        headers = NO_STORE
+        if offset:
+            headers = {
+                **NO_STORE, 'Range': f'bytes={offset}-', 'If-Range': validator
+            }
+        with session.get(url, headers=headers, stream=True) as response:
+            if response.status_code == RANGE_NOT_SATISFIABLE:
+                discard_partial(path)
+                continue
+            response.raise_for_status()
+            total, start = expected_size(response)
+            if response.status_code == PARTIAL_CONTENT and start != offset:
+                discard_partial(path)
+                continue
+            if response.status_code != PARTIAL_CONTENT:
+                validator = response_validator(response)
+                if validator:
+                    validator_path(path).write_text(validator)
+                else:
+                    validator_path(path).unlink(missing_ok=True)
+            sha256 = write_chunks(response, part_path, offset, chunk_size)
+        if total is not None and part_path.stat().st_size != total:
+            discard_partial(path)
+            continue
+        break
+    else:
+        raise ConnectionError(ARCHIVE_INCOMPLETE.format(url=url))
+    os.replace(part_path, path)
+    validator_path(path).unlink(missing_ok=True)
+    checksum = sha256.hexdigest()
+    checksum_path(path).write_text(
+        CHECKSUM_LINE.format(checksum=checksum, name=path.name)
+    )
+    return checksum
+
+
+def archive_format(url):
+    for name, pattern in ARCHIVE_FORMATS.items():
+        if re.search(pattern, url):
+            return name
+    return None
+
+
+def select_archives(urls, formats=None, all_formats=False):
+    if all_formats:
+        return urls
+    if formats:
+        return [url for url in urls if archive_format(url) in formats]
+    return urls[:1]
+
+
+def host_limit(session, url):
+    """Лимит соединений к хосту из FetchPolicy транспорта сессии."""
+    policy = getattr(session.get_adapter(url), 'policy', None)
+    return getattr(policy, 'host_connections', HOST_CONNECTIONS)
+
+
+def host_semaphore(url, limit=HOST_CONNECTIONS):
+    key = (urlsplit(url).netloc, limit)
+    with host_semaphores_lock:
+        if key not in host_semaphores:
+            host_semaphores[key] = Semaphore(limit)
+        return host_semaphores[key]
+
+
+def is_up_to_date(session, url, path):
+    """Архив на месте и совпадает с сервером по размеру и контрольной сумме.
+
+    Если HEAD не удался, размер сверить не с чем: архив считается
+    непроверенным и загружается заново.
+    """
+    from requests import RequestException
+    if not path.exists() or not checksum_path(path).exists():
+        return False
+    try:
+        response = session.head(url, headers=NO_STORE, allow_redirects=True)
+    except RequestException:
+        return False
+    if not response.ok:
+        return False
+    size = response.headers.get('Content-Length')
+    if size is not None and int(size) != path.stat().st_size:
+        return False
+    checksum = checksum_path(path).read_text().split()[0]
+    return checksum == hash_file(path).hexdigest()
+
+
+def download_archive(session, url, path):
+    with host_semaphore(url, host_limit(session, url)):
+        if is_up_to_date(session, url, path):
+            return None
+        return stream_download(session, url, path)
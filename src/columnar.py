@@ -0,0 +1,166 @@
+import importlib.util
+import json
+import struct
+import sys
+import zlib
+from array import array
+
+from exceptions import ColumnarFormatException
+
+MAGIC = b'PCOL1\n'
+HEADER_SIZE = struct.Struct('<I')
+PARQUET_EXTENSION = 'parquet'
+COLUMNS_EXTENSION = 'cols'
+INT = 'int'
+FLOAT = 'float'
+STR = 'str'
+ARRAY_TYPECODES = {INT: 'q', FLOAT: 'd'}
+COLUMN_TYPES = {INT: int, FLOAT: float, STR: str}
+NULL_FILL = {INT: 0, FLOAT: 0.0, STR: ''}
+COMPRESSION_LEVEL = 1
+BAD_MAGIC = 'Файл {path} не является колоночным файлом парсера'
+
+
+def column_type(values):
+    """Тип колонки по значениям без учёта None.
+
+    Целые и дробные вместе дают FLOAT, всё прочее смешанное — STR; те же
+    правила применяются и для parquet, чтобы оба формата читались
+    одинаково.
+    """
+    present = [value for value in values if value is not None]
+    if not present:
+        return STR
+    if all(isinstance(value, int) and not isinstance(value, bool)
+           for value in present):
+        return INT
+    if all(isinstance(value, (int, float)) and not isinstance(value, bool)
+           for value in present):
+        return FLOAT
+    return STR
+
+
+def column_values(values, kind):
+    convert = COLUMN_TYPES[kind]
+    return [None if value is None else convert(value) for value in values]
+
+
+def to_little_endian(values):
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def encode_column(values, kind):
+    values = [NULL_FILL[kind] if value is None else value for value in values]
+    if kind in ARRAY_TYPECODES:
+        return to_little_endian(array(ARRAY_TYPECODES[kind], values)).tobytes()
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = array('Q', [0])
+    for item in encoded:
+        offsets.append(offsets[-1] + len(item))
+    return to_little_endian(offsets).tobytes() + b''.join(encoded)
+
+
+def encode_nulls(values):
+    """Маска пропусков: байт на строку, 1 — значение None."""
+    return bytes(value is None for value in values)
+
+
+def apply_nulls(values, mask):
+    return [None if null else value for value, null in zip(values, mask)]
+
+
+def decode_column(data, kind, rows):
+    if kind in ARRAY_TYPECODES:
+        values = array(ARRAY_TYPECODES[kind])
+        values.frombytes(data)
+        return to_little_endian(values).tolist()
+    offsets = array('Q')
+    offsets.frombytes(data[:(rows + 1) * offsets.itemsize])
+    offsets = to_little_endian(offsets)
+    strings = data[(rows + 1) * offsets.itemsize:]
+    return [
+        strings[start:end].decode('utf-8')
+        for start, end in zip(offsets, offsets[1:])
+    ]
+
+
+def pyarrow_available():
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def columnar_extension():
+    return PARQUET_EXTENSION if pyarrow_available() else COLUMNS_EXTENSION
+
+
+def arrow_column(values, kind):
+    import pyarrow
+    return pyarrow.array(values, type={
+        INT: pyarrow.int64(), FLOAT: pyarrow.float64(), STR: pyarrow.string()
+    }[kind])
+
+
+def write_columnar(path, results):
+    header, *rows = results
+    columns = [list(column) for column in zip(*rows)] or [[] for _ in header]
+    kinds = [column_type(column) for column in columns]
+    columns = [
+        column_values(column, kind) for column, kind in zip(columns, kinds)
+    ]
+    if path.suffix == f'.{PARQUET_EXTENSION}':
+        import pyarrow
+        from pyarrow import parquet
+        parquet.write_table(pyarrow.table({
+            name: arrow_column(column, kind)
+            for name, column, kind in zip(header, columns, kinds)
+        }), str(path))
+        return
+    blocks = []
+    meta_columns = []
+    for name, column, kind in zip(header, columns, kinds):
+        block = zlib.compress(encode_column(column, kind), COMPRESSION_LEVEL)
+        blocks.append(block)
+        meta_column = {'name': name, 'type': kind, 'size': len(block)}
+        if None in column:
+            nulls = zlib.compress(encode_nulls(column), COMPRESSION_LEVEL)
+            blocks.append(nulls)
+            meta_column['nulls'] = len(nulls)
+        meta_columns.append(meta_column)
+    meta = json.dumps(
+        {'rows': len(rows), 'columns': meta_columns}, ensure_ascii=False
+    ).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(MAGIC + HEADER_SIZE.pack(len(meta)) + meta)
+        for block in blocks:
+            f.write(block)
+
+
+def read_columnar(path):
+    if path.suffix == f'.{PARQUET_EXTENSION}':
+        from pyarrow import parquet
+        table = parquet.read_table(str(path))
+        return [tuple(table.column_names), *zip(*(
+            column.to_pylist() for column in table.columns
+        ))]
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ColumnarFormatException(BAD_MAGIC.format(path=path))
+        size, = HEADER_SIZE.unpack(f.read(HEADER_SIZE.size))
+        meta = json.loads(f.read(size))
+        columns = []
+        for column in meta['columns']:
+            values = decode_column(
+                zlib.decompress(f.read(column['size'])),
+                column['type'],
+                meta['rows']
+            )
+            if column.get('nulls'):
+                values = apply_nulls(
+                    values, zlib.decompress(f.read(column['nulls']))
+                )
+            columns.append(values)
+    return [
+        tuple(column['name'] for column in meta['columns']),
+        *zip(*columns),
+    ]
@@ -1,17 +1,75 @@
 import argparse
 import logging
 from logging.handlers import RotatingFileHandler
+from pathlib import Path
 
-from constants import LOG_DIR, LOG_FILE, PRETTY_FILEDATA, FILE_OUTPUT
+from constants import (ARCHIVE_FORMATS, BACKOFF, BASE_DIR, CACHE_FOREVER,
+                       CACHE_MAX_SIZE, CACHE_REVALIDATE, CACHE_TTL, CACHES,
+                       COLUMNAR_OUTPUT, DBM_BACKEND, FILE_OUTPUT,
+                       FILESYSTEM_BACKEND, GZIP_COMPRESSION, HOST_CONNECTIONS,
+                       HOSTS_RATE, HOSTS_TTL, JSONL_OUTPUT, LOG_DIR, LOG_FILE,
+                       MEMORY_BACKEND, NO_COMPRESSION, PARSED_CACHE_SIZE,
+                       POOL_CONNECTIONS, PRETTY_FILEDATA, RETRIES,
+                       SERVER_PORT, SQLITE_BACKEND, TIMEOUT, ZSTD_COMPRESSION)
 
 LOG_FORMAT = '"%(asctime)s - [%(levelname)s] - %(message)s"'
 DT_FORMAT = '%d.%m.%Y %H:%M:%S'
+NOT_POSITIVE = 'Ожидается целое число больше нуля, получено {value}'
+BAD_TTL = 'Ожидается HOST=SECONDS, получено {value}'
+BAD_RATE = 'Ожидается HOST=RPS, получено {value}'
+HTTP2_UNAVAILABLE = 'HTTP/2 недоступен: установите h2 и urllib3>=2.3'
+ZSTD_UNAVAILABLE = 'zstd недоступен: установите zstandard, используется gzip'
+MIXED_COMMANDS = 'Команда {command} запускается без других режимов'
 
 
-def configure_argument_parser(available_modes):
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(NOT_POSITIVE.format(value=value))
+    return number
+
+
+def host_ttl(value):
+    host, _, seconds = value.partition('=')
+    if not host or not seconds.isdigit():
+        raise argparse.ArgumentTypeError(BAD_TTL.format(value=value))
+    return host, int(seconds)
+
+
+def host_rate(value):
+    host, _, rate = value.partition('=')
+    try:
+        rate = float(rate)
+    except ValueError:
+        rate = 0
+    if not host or rate <= 0:
+        raise argparse.ArgumentTypeError(BAD_RATE.format(value=value))
+    return host, rate
+
+
+class ModesAction(argparse._StoreAction):
+    """Несколько режимов подряд, но команды - только поодиночке."""
+
+    def __init__(self, *args, commands=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.commands = commands
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        commands = [value for value in values if value in self.commands]
+        if commands and len(values) > 1:
+            raise argparse.ArgumentError(
+                self, MIXED_COMMANDS.format(command=commands[0])
+            )
+        super().__call__(parser, namespace, values, option_string)
+
+
+def configure_argument_parser(available_modes, commands=()):
     parser = argparse.ArgumentParser(description='Парсер документации Python')
     parser.add_argument(
         'mode',
+        nargs='+',
+        action=ModesAction,
+        commands=commands,
         choices=available_modes,
         help='Режимы работы парсера'
     )
@@ -21,12 +79,180 @@ def configure_argument_parser(available_modes):
         action='store_true',
         help='Очистка кеша'
     )
+    parser.add_argument(
+        '--clear-parsed-cache',
+        action='store_true',
+        help='Очистка кеша разобранных страниц'
+    )
+    parser.add_argument(
+        '--parsed-cache-size',
+        type=int,
+        default=PARSED_CACHE_SIZE,
+        help='Размер кеша разобранных страниц, 0 - отключить'
+    )
+    parser.add_argument(
+        '--cache-backend',
+        choices=(
+            SQLITE_BACKEND, FILESYSTEM_BACKEND, MEMORY_BACKEND, DBM_BACKEND
+        ),
+        default=SQLITE_BACKEND,
+        help='Хранилище HTTP-кеша'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        type=Path,
+        help='Папка HTTP-кеша и кеша разбора, по умолчанию ./cache/'
+    )
+    parser.add_argument(
+        '--cache-compression',
+        choices=(GZIP_COMPRESSION, ZSTD_COMPRESSION, NO_COMPRESSION),
+        default=GZIP_COMPRESSION,
+        help='Сжатие ответов в HTTP-кеше'
+    )
+    parser.add_argument(
+        '--cache-max-size',
+        type=int,
+        default=CACHE_MAX_SIZE,
+        help='Максимальный размер HTTP-кеша в МиБ, 0 - без ограничения'
+    )
+    parser.add_argument(
+        '--from-snapshot',
+        type=Path,
+        metavar='PATH',
+        help='Читать страницы из снимка вместо сети'
+    )
+    parser.add_argument(
+        '--snapshot-output',
+        type=Path,
+        metavar='PATH',
+        help='Куда сохранить снимок в режиме snapshot-build, '
+             'по умолчанию ./snapshots/docs.snapshot'
+    )
+    parser.add_argument(
+        '--server',
+        metavar='URL',
+        help='Выполнить режим на запущенном сервере парсера'
+    )
+    parser.add_argument(
+        '--port',
+        type=positive_int,
+        default=SERVER_PORT,
+        help='Порт сервера парсера в режиме serve'
+    )
     parser.add_argument(
         '-o',
         '--output',
-        choices=(PRETTY_FILEDATA, FILE_OUTPUT),
+        choices=(
+            PRETTY_FILEDATA, FILE_OUTPUT, JSONL_OUTPUT, COLUMNAR_OUTPUT
+        ),
         help='Дополнительные способы вывода данных'
     )
+    parser.add_argument(
+        '-w',
+        '--workers',
+        type=positive_int,
+        help='Количество одновременных загрузок страниц'
+    )
+    parser.add_argument(
+        '--parse-procs',
+        type=positive_int,
+        help='Количество процессов для разбора страниц'
+    )
+    parser.add_argument(
+        '--cache-policy',
+        choices=(CACHE_FOREVER, CACHE_REVALIDATE),
+        default=CACHE_FOREVER,
+        help='Политика кеша: хранить вечно или перепроверять по ETag'
+    )
+    parser.add_argument(
+        '--ttl',
+        type=host_ttl,
+        action='append',
+        default=[],
+        metavar='HOST=SECONDS',
+        help='Время жизни кеша для хоста в режиме revalidate'
+    )
+    parser.add_argument(
+        '--depth',
+        type=positive_int,
+        help='Глубина обхода ссылок в режиме whats-new, по умолчанию 1'
+    )
+    parser.add_argument(
+        '-i',
+        '--incremental',
+        action='store_true',
+        help='Разбирать только новые и изменившиеся карточки PEP'
+    )
+    parser.add_argument(
+        '--formats',
+        nargs='+',
+        choices=tuple(ARCHIVE_FORMATS),
+        help='Форматы документации для загрузки'
+    )
+    parser.add_argument(
+        '--all',
+        action='store_true',
+        help='Загрузить документацию во всех форматах'
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Замерить время фаз работы парсера'
+    )
+    parser.add_argument(
+        '--rate',
+        type=host_rate,
+        action='append',
+        default=[],
+        metavar='HOST=RPS',
+        help='Ограничение числа запросов в секунду к хосту'
+    )
+    parser.add_argument(
+        '--host-connections',
+        type=positive_int,
+        default=HOST_CONNECTIONS,
+        help='Максимум одновременных запросов к одному хосту'
+    )
+    parser.add_argument(
+        '--retries',
+        type=int,
+        default=RETRIES,
+        help='Число повторов при 429, 5xx и таймаутах'
+    )
+    parser.add_argument(
+        '--backoff',
+        type=float,
+        default=BACKOFF,
+        help='Базовая задержка экспоненциальной паузы между повторами, с'
+    )
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=TIMEOUT,
+        help='Таймаут запроса, с'
+    )
+    parser.add_argument(
+        '--pool-size',
+        type=positive_int,
+        help='Размер пула соединений к одному хосту, '
+             'по умолчанию равен --host-connections'
+    )
+    parser.add_argument(
+        '--pool-connections',
+        type=positive_int,
+        default=POOL_CONNECTIONS,
+        help='Число хостов, для которых хранятся пулы соединений'
+    )
+    parser.add_argument(
+        '--no-keep-alive',
+        action='store_true',
+        help='Закрывать соединение после каждого запроса'
+    )
+    parser.add_argument(
+        '--http2',
+        action='store_true',
+        help='Использовать HTTP/2, если он доступен'
+    )
     return parser
 
 
@@ -41,3 +267,91 @@ def configure_logging():
         level=logging.INFO,
         handlers=(rotating_handler, logging.StreamHandler())
     )
+
+
+def configure_session(cli_args=None, **session_kwargs):
+    import requests_cache
+    from urllib3.util.request import ACCEPT_ENCODING
+
+    from fetch_policy import FetchPolicyAdapter, enable_http2
+    from http_cache import CacheLimiter
+    policy = getattr(cli_args, 'cache_policy', None) or CACHE_FOREVER
+    if policy == CACHE_REVALIDATE:
+        session_kwargs.update(
+            expire_after=CACHE_TTL,
+            urls_expire_after={
+                **HOSTS_TTL, **dict(getattr(cli_args, 'ttl', None) or [])
+            },
+        )
+    snapshot_path = getattr(cli_args, 'from_snapshot', None)
+    if snapshot_path:
+        session_kwargs.setdefault('backend', MEMORY_BACKEND)
+    if 'backend' not in session_kwargs:
+        session_kwargs['backend'] = configure_cache(cli_args)
+    session = requests_cache.CachedSession(**session_kwargs)
+    if not hasattr(session.cache, 'limiter'):
+        CacheLimiter(session.cache)
+    if snapshot_path:
+        return mount_snapshot(session, snapshot_path)
+    keep_alive = not getattr(cli_args, 'no_keep_alive', False)
+    policy = configure_fetch_policy(cli_args)
+    adapter = FetchPolicyAdapter(
+        policy,
+        keep_alive=keep_alive,
+        pool_connections=getattr(
+            cli_args, 'pool_connections', POOL_CONNECTIONS
+        ),
+        pool_maxsize=(
+            getattr(cli_args, 'pool_size', None) or policy.host_connections
+        ),
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({
+        'Accept-Encoding': ACCEPT_ENCODING,
+        'Connection': 'keep-alive' if keep_alive else 'close',
+    })
+    if getattr(cli_args, 'http2', False) and not enable_http2():
+        logging.warning(HTTP2_UNAVAILABLE)
+    return session
+
+
+def mount_snapshot(session, path):
+    from snapshot import Snapshot, SnapshotAdapter
+    adapter = SnapshotAdapter(Snapshot(path))
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def configure_cache(cli_args=None):
+    from http_cache import (MEBIBYTE, CacheLimiter, access_log_path,
+                            compression_available, open_cache)
+    backend = getattr(cli_args, 'cache_backend', None) or SQLITE_BACKEND
+    cache_dir = getattr(cli_args, 'cache_dir', None) or BASE_DIR / CACHES
+    compression = (
+        getattr(cli_args, 'cache_compression', None) or GZIP_COMPRESSION
+    )
+    if not compression_available(compression):
+        logging.warning(ZSTD_UNAVAILABLE)
+        compression = GZIP_COMPRESSION
+    cache = open_cache(backend, cache_dir, compression)
+    CacheLimiter(
+        cache,
+        access_log_path(backend, cache_dir),
+        getattr(cli_args, 'cache_max_size', CACHE_MAX_SIZE) * MEBIBYTE,
+    )
+    return cache
+
+
+def configure_fetch_policy(cli_args=None):
+    from fetch_policy import FetchPolicy
+    return FetchPolicy(
+        rates={**HOSTS_RATE, **dict(getattr(cli_args, 'rate', None) or [])},
+        retries=getattr(cli_args, 'retries', RETRIES),
+        backoff=getattr(cli_args, 'backoff', BACKOFF),
+        timeout=getattr(cli_args, 'timeout', TIMEOUT),
+        host_connections=getattr(
+            cli_args, 'host_connections', HOST_CONNECTIONS
+        ),
+    )
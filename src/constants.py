@@ -6,13 +6,65 @@ PEP_DOC_URL = 'https://peps.python.org/'
 BASE_DIR = Path(__file__).parent
 RESULTS = 'results'
 DOWNLOADS = 'downloads'
+STATES = 'states'
+PROFILES = 'profiles'
+PEP_STATE = 'pep.json'
+CACHES = 'cache'
+SNAPSHOTS = 'snapshots'
+SNAPSHOT_FILE = 'docs.snapshot'
+PARSED_CACHE = 'parsed.sqlite'
+PARSED_CACHE_SIZE = 10000
+CHUNK_SIZE = 64 * 1024
+HOST_CONNECTIONS = 10
+RETRIES = 3
+BACKOFF = 0.5
+MAX_BACKOFF = 30
+TIMEOUT = 30
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+POOL_CONNECTIONS = 10
+HOSTS_RATE = {
+    'docs.python.org': 20,
+    'peps.python.org': 20,
+}
+ARCHIVE_FORMATS = {
+    'pdf-a4': r'-pdf-a4\.',
+    'pdf-letter': r'-pdf-letter\.',
+    'html': r'-html\.',
+    'text': r'-text\.',
+    'epub': r'\.epub$',
+}
 PRETTY_FILEDATA = 'pretty'
 FILE_OUTPUT = 'file'
+JSONL_OUTPUT = 'jsonl'
+COLUMNAR_OUTPUT = 'columnar'
 LOG_DIR = BASE_DIR / 'logs'
 LOG_FILE = LOG_DIR / 'parser.log'
 
 DATETIME_FORMAT = '%Y-%m-%d_%H-%M-%S'
 
+WORKERS = 1
+WHATS_NEW_DEPTH = 1
+
+CACHE_FOREVER = 'forever'
+CACHE_REVALIDATE = 'revalidate'
+CACHE_TTL = 60 * 60
+HOSTS_TTL = {
+    'docs.python.org': 24 * 60 * 60,
+    'peps.python.org': 60 * 60,
+}
+HTTP_CACHE = 'http_cache'
+SQLITE_BACKEND = 'sqlite'
+FILESYSTEM_BACKEND = 'filesystem'
+MEMORY_BACKEND = 'memory'
+DBM_BACKEND = 'dbm'
+GZIP_COMPRESSION = 'gzip'
+ZSTD_COMPRESSION = 'zstd'
+NO_COMPRESSION = 'none'
+CACHE_MAX_SIZE = 64
+
+SERVER_HOST = '127.0.0.1'
+SERVER_PORT = 8765
+
 EXPECTED_STATUS = {
     'A': ('Active', 'Accepted'),
     'D': ('Deferred',),
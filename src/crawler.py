@@ -0,0 +1,74 @@
+from collections import namedtuple
+from functools import partial
+from urllib.parse import urljoin
+
+from engines import parse_ahead, resolve_ahead, resolved, run_engine
+from utils import get_response, normalize_url
+
+CrawlPage = namedtuple('CrawlPage', 'url depth record error')
+
+
+def url_scope(url):
+    """Префикс адреса: страница и всё, что лежит рядом с ней и глубже."""
+    url = normalize_url(url)
+    return url[:url.rfind('/') + 1]
+
+
+def visit(session, visit_page, max_depth, page):
+    url, depth = page
+    try:
+        response = get_response(session, url)
+    except ConnectionError as e:
+        return CrawlPage(url, depth, None, e), url, []
+    record, links = visit_page(response, depth, depth < max_depth)
+    return CrawlPage(url, depth, record, None), response.url or url, links
+
+
+def finish(visited):
+    """Дожидается разбора страницы и делает её ссылки абсолютными."""
+    page, base_url, links = visited
+    return page._replace(record=resolved(page.record)), [
+        urljoin(base_url, link) for link in resolved(links)
+    ]
+
+
+def crawl(session, start_url, visit_page, max_depth=1, scopes=None,
+          cli_args=None):
+    """Обход ссылок в ширину, уровень глубины за раз.
+
+    visit_page(response, depth, follow) возвращает запись страницы и её
+    ссылки; ссылки нужны, только если follow. Запись и ссылки могут быть
+    Future из пула разбора. Страницы уровня загружаются движком
+    run_engine, а их разборы дожидаются с забором на --parse-procs
+    страниц вперёд; порядок страниц внутри уровня — порядок ссылок.
+    Адреса приводятся к одному виду, каждый загружается один раз и только
+    если начинается с одного из префиксов scopes (по умолчанию — папка
+    стартовой страницы). Ошибка загрузки стартовой страницы не
+    перехватывается: без неё обходить нечего.
+    """
+    start_url = normalize_url(start_url)
+    scopes = tuple(map(normalize_url, scopes or (url_scope(start_url),)))
+    response = get_response(session, start_url)
+    record, links = visit_page(response, 0, max_depth > 0)
+    yield CrawlPage(start_url, 0, resolved(record), None)
+    visited = {start_url}
+    frontier = [
+        urljoin(response.url or start_url, link) for link in resolved(links)
+    ]
+    for depth in range(1, max_depth + 1):
+        level = []
+        for url in map(normalize_url, frontier):
+            if url not in visited and url.startswith(scopes):
+                visited.add(url)
+                level.append((url, depth))
+        frontier = []
+        for page, links in resolve_ahead(
+            run_engine(
+                partial(visit, session, visit_page, max_depth), level,
+                cli_args
+            ),
+            finish,
+            parse_ahead(cli_args)
+        ):
+            yield page
+            frontier.extend(links)
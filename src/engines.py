@@ -0,0 +1,135 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from constants import WORKERS
+from profiling import profiled, profiler
+
+PARSE_START_METHOD = 'spawn'
+
+
+def sync_map(func, items, workers=WORKERS):
+    if workers <= 1:
+        yield from map(func, items)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(func, items)
+
+
+def run_engine(func, items, cli_args=None):
+    workers = getattr(cli_args, 'workers', None)
+    if workers is None:
+        return sync_map(func, items)
+    return sync_map(func, items, workers)
+
+
+def parse_ahead(cli_args=None):
+    return getattr(cli_args, 'parse_procs', None) or 0
+
+
+def resolve_ahead(items, resolve, ahead):
+    """resolve для каждого элемента по порядку, с забором на ahead вперёд.
+
+    Пока ждётся разбор самой старой страницы, items успевает загрузить
+    следующие и отдать их в пул разбора.
+    """
+    pending = deque()
+    for item in items:
+        pending.append(item)
+        if len(pending) > ahead:
+            yield resolve(pending.popleft())
+    while pending:
+        yield resolve(pending.popleft())
+
+
+def open_parse_pool(procs):
+    """Процессы для извлекателей: потоки загрузки отдают им сырые байты.
+
+    Процессы запускаются через spawn: fork из процесса, где уже работают
+    потоки загрузки, может унаследовать захваченные ими блокировки.
+    """
+    if not procs:
+        return None
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    return ProcessPoolExecutor(
+        max_workers=procs,
+        mp_context=multiprocessing.get_context(PARSE_START_METHOD),
+    )
+
+
+def parse_pool(session):
+    return getattr(session, 'parse_pool', None)
+
+
+def profiled_call(extractor, *args):
+    """Вызов в процессе пула с замером фаз извлекателя.
+
+    Профилировщик процесса пула выключен и ничего не копит, поэтому
+    длительности фаз возвращаются родителю вместе с результатом.
+    """
+    profiler.reset()
+    profiler.enabled = True
+    try:
+        return extractor(*args), dict(profiler.timings)
+    finally:
+        profiler.enabled = False
+        profiler.reset()
+
+
+def chain(future, func):
+    """Future с результатом func(future), когда future завершится."""
+    chained = Future()
+
+    def done(source):
+        try:
+            chained.set_result(func(source))
+        except Exception as e:
+            chained.set_exception(e)
+
+    future.add_done_callback(done)
+    return chained
+
+
+def merged_timings(future):
+    result, timings = future.result()
+    profiler.merge(timings)
+    return result
+
+
+def completed(value):
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+def submit_parser(pool, extractor, *args):
+    """Разбор без ожидания: Future с результатом extractor(*args).
+
+    Без пула извлекатель вызывается сразу и Future уже завершена.
+    """
+    if pool is None:
+        parsed = Future()
+        try:
+            parsed.set_result(extractor(*args))
+        except Exception as e:
+            parsed.set_exception(e)
+        return parsed
+    if not profiler.enabled:
+        return pool.submit(extractor, *args)
+    return chain(
+        pool.submit(profiled_call, extractor, *args), merged_timings
+    )
+
+
+@profiled('parse_pool')
+def parse_result(future):
+    return future.result()
+
+
+def resolved(value):
+    """Итог разбора: Future дожидается, готовое значение отдаётся как есть."""
+    return parse_result(value) if isinstance(value, Future) else value
+
+
+def run_parser(pool, extractor, *args):
+    return parse_result(submit_parser(pool, extractor, *args))
@@ -1,2 +1,10 @@
 class ParserFindTagException(Exception):
     """Вызывается, когда парсер не может найти тег."""
+
+
+class ColumnarFormatException(Exception):
+    """Вызывается, когда файл не является колоночным файлом парсера."""
+
+
+class SnapshotFormatException(Exception):
+    """Вызывается, когда файл не является снимком страниц парсера."""
@@ -0,0 +1,181 @@
+import threading
+from collections import deque, namedtuple
+
+from exceptions import ParserFindTagException
+from profiling import profiled
+from utils import ERROR_MESSAGE
+
+EXTRACTORS_VERSION = 1
+FEED_SIZE = 16 * 1024
+PEP_INDEX_SECTION = {'id': 'numerical-index'}
+PEP_LINK = {'class': 'pep reference internal'}
+WHATS_NEW_NOTE = {'class': 'toctree-l1'}
+
+idle_parsers = threading.local()
+
+PepIndexRecord = namedtuple(
+    'PepIndexRecord', 'number type status_abbr href title'
+)
+
+
+def matches(element, attrs):
+    for name, value in attrs.items():
+        actual = element.get(name)
+        if actual is None:
+            return False
+        if name == 'class' and value in actual.split():
+            continue
+        if actual != value:
+            return False
+    return True
+
+
+def element_text(element):
+    return ''.join(element.itertext())
+
+
+def parse_events(content, tags, encoding='utf-8'):
+    """События start/end для тегов tags, страница подаётся частями.
+
+    Парсеры переиспользуются внутри потока: новый парсер на каждую
+    страницу оставляет цикл ссылок с журналом ошибок и очередью событий,
+    и память растёт до прохода сборщика мусора. При досрочном выходе
+    парсер закрывается, а очередь вычитывается, чтобы не держать дерево.
+    У пустой страницы событий нет: lxml не закрывает парсер без данных.
+    """
+    if not content:
+        return
+    from lxml import etree
+    key = (frozenset(tags), encoding)
+    idle = idle_parsers.__dict__.setdefault('parsers', {})
+    parser = idle.pop(key, None) or etree.HTMLPullParser(
+        events=('start', 'end'), tag=tags, encoding=encoding
+    )
+    closed = False
+    try:
+        for start in range(0, len(content), FEED_SIZE):
+            parser.feed(content[start:start + FEED_SIZE])
+            yield from parser.read_events()
+        closed = True
+        parser.close()
+        yield from parser.read_events()
+    finally:
+        if not closed:
+            try:
+                parser.close()
+            except etree.LxmlError:
+                pass
+        deque(parser.read_events(), maxlen=0)
+        idle[key] = parser
+
+
+@profiled('extract_first')
+def extract_first(content, *specs, encoding='utf-8'):
+    found = [None] * len(specs)
+    opened = {}
+    events = parse_events(
+        content, {tag for tag, _ in specs}, encoding=encoding
+    )
+    for event, element in events:
+        if event == 'start':
+            for index, (tag, attrs) in enumerate(specs):
+                if (
+                    found[index] is None and index not in opened
+                    and element.tag == tag and matches(element, attrs or {})
+                ):
+                    opened[index] = element
+            continue
+        for index, opened_element in list(opened.items()):
+            if opened_element is element:
+                found[index] = opened.pop(index)
+        if all(item is not None for item in found):
+            break
+    events.close()
+    for (tag, attrs), element in zip(specs, found):
+        if element is None:
+            raise ParserFindTagException(
+                ERROR_MESSAGE.format(tag=tag, attrs=attrs)
+            )
+    return found
+
+
+def pep_card_status(content, encoding='utf-8'):
+    abbr, = extract_first(content, ('abbr', None), encoding=encoding)
+    return element_text(abbr)
+
+
+def whats_new_record(content, encoding='utf-8'):
+    h1, dl = extract_first(
+        content, ('h1', None), ('dl', None), encoding=encoding
+    )
+    return element_text(h1), element_text(dl).replace('\n', ' ')
+
+
+def pep_index_record(tr):
+    cells = tr.findall('td')
+    if not cells:
+        return None
+    abbr = next(tr.iter('abbr'), None)
+    link = next((a for a in tr.iter('a') if matches(a, PEP_LINK)), None)
+    if abbr is None or link is None:
+        tag, attrs = ('abbr', None) if abbr is None else ('a', PEP_LINK)
+        raise ParserFindTagException(
+            ERROR_MESSAGE.format(tag=tag, attrs=attrs)
+        )
+    abbr_text = element_text(abbr)
+    return PepIndexRecord(
+        number=element_text(link),
+        type=abbr_text[:1],
+        status_abbr=abbr_text[1:],
+        href=link.get('href'),
+        title=element_text(cells[2]) if len(cells) > 2 else '',
+    )
+
+
+@profiled('pep_index_records')
+def pep_index_records(content, encoding='utf-8'):
+    """Строки числового индекса PEP за один проход по странице."""
+    records = []
+    section = None
+    events = parse_events(content, ('section', 'tr'), encoding=encoding)
+    for event, element in events:
+        if element.tag == 'section':
+            if matches(element, PEP_INDEX_SECTION):
+                if event == 'end':
+                    break
+                section = element
+            continue
+        if event == 'end' and section is not None:
+            record = pep_index_record(element)
+            if record is not None:
+                records.append(record)
+            element.clear()
+    events.close()
+    if section is None:
+        raise ParserFindTagException(
+            ERROR_MESSAGE.format(tag='section', attrs=PEP_INDEX_SECTION)
+        )
+    return records
+
+
+def whats_new_links(content, encoding='utf-8'):
+    """Ссылки на статьи из оглавления whatsnew: первая ссылка toctree-l1."""
+    links = []
+    in_note = False
+    for event, element in parse_events(content, ('li', 'a'), encoding):
+        if event != 'start':
+            continue
+        if element.tag == 'li':
+            in_note = matches(element, WHATS_NEW_NOTE)
+        elif in_note and element.get('href') is not None:
+            links.append(element.get('href'))
+            in_note = False
+    return links
+
+
+def page_links(content, encoding='utf-8'):
+    return [
+        element.get('href')
+        for event, element in parse_events(content, ('a',), encoding)
+        if event == 'start' and element.get('href') is not None
+    ]
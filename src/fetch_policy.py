@@ -0,0 +1,148 @@
+import email.utils
+import importlib.util
+import random
+import socket
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from itertools import count
+from threading import Lock, Semaphore
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+from constants import (BACKOFF, HOST_CONNECTIONS, MAX_BACKOFF, RETRIES,
+                       RETRY_STATUSES, TIMEOUT)
+
+RETRY_EXCEPTIONS = (requests.ConnectionError, requests.Timeout)
+KEEPALIVE_OPTIONS = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+
+
+def enable_http2():
+    if importlib.util.find_spec('h2') is None:
+        return False
+    try:
+        from urllib3.http2 import inject_into_urllib3
+    except ImportError:
+        return False
+    inject_into_urllib3()
+    return True
+
+
+class TokenBucket:
+    """Ограничивает частоту запросов: rate токенов в секунду."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = Lock()
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+
+def retry_after(response):
+    value = response.headers.get('Retry-After')
+    if value is None:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        moment = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max((moment - datetime.now(timezone.utc)).total_seconds(), 0)
+
+
+class FetchPolicy:
+    """Лимиты частоты и параллельности по хостам и правила повторов."""
+
+    def __init__(
+        self, rates=None, retries=RETRIES, backoff=BACKOFF,
+        timeout=TIMEOUT, host_connections=HOST_CONNECTIONS
+    ):
+        self.rates = dict(rates or {})
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.host_connections = host_connections
+        self.lock = Lock()
+        self.buckets = {}
+        self.semaphores = defaultdict(lambda: Semaphore(host_connections))
+
+    def throttle(self, host):
+        rate = self.rates.get(host)
+        if not rate:
+            return
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(rate)
+            bucket = self.buckets[host]
+        bucket.acquire()
+
+    def semaphore(self, host):
+        with self.lock:
+            return self.semaphores[host]
+
+    def backoff_delay(self, attempt):
+        return random.uniform(0, min(MAX_BACKOFF, self.backoff * 2 ** attempt))
+
+    def retry_delay(self, attempt, response):
+        delay = retry_after(response)
+        if delay is None:
+            return self.backoff_delay(attempt)
+        return min(delay, MAX_BACKOFF)
+
+
+class FetchPolicyAdapter(HTTPAdapter):
+    """Транспорт, который применяет FetchPolicy к запросам в сеть."""
+
+    def __init__(self, policy=None, keep_alive=True, **kwargs):
+        self.policy = policy or FetchPolicy()
+        self.keep_alive = keep_alive
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **pool_kwargs):
+        if self.keep_alive:
+            pool_kwargs['socket_options'] = (
+                HTTPConnection.default_socket_options + KEEPALIVE_OPTIONS
+            )
+        super().init_poolmanager(*args, **pool_kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        host = urlsplit(request.url).netloc
+        for attempt in count():
+            self.policy.throttle(host)
+            try:
+                with self.policy.semaphore(host):
+                    response = super().send(
+                        request, timeout=timeout or self.policy.timeout,
+                        **kwargs
+                    )
+            except RETRY_EXCEPTIONS:
+                if attempt >= self.policy.retries:
+                    raise
+                time.sleep(self.policy.backoff_delay(attempt))
+                continue
+            if (
+                response.status_code not in RETRY_STATUSES
+                or attempt >= self.policy.retries
+            ):
+                return response
+            response.close()
+            time.sleep(self.policy.retry_delay(attempt, response))
@@ -0,0 +1,267 @@
+import dbm
+import gzip
+import importlib.util
+import pickle
+import time
+from collections import Counter
+from functools import partial
+from threading import Lock
+
+from requests_cache.backends import (BaseCache, BaseStorage, DictStorage,
+                                     FileCache, FileDict, SQLiteCache,
+                                     SQLiteDict)
+from requests_cache.serializers import CattrStage, SerializerPipeline, Stage
+
+from constants import (DBM_BACKEND, FILESYSTEM_BACKEND, GZIP_COMPRESSION,
+                       HTTP_CACHE, MEMORY_BACKEND, NO_COMPRESSION,
+                       SQLITE_BACKEND, ZSTD_COMPRESSION)
+from state import load_state, save_state
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+MEBIBYTE = 1024 * 1024
+
+
+def gzip_stage():
+    return Stage(
+        dumps=partial(gzip.compress, compresslevel=GZIP_LEVEL),
+        loads=gzip.decompress,
+    )
+
+
+def zstd_stage():
+    import zstandard
+    return Stage(
+        dumps=partial(zstandard.compress, level=ZSTD_LEVEL),
+        loads=zstandard.decompress,
+    )
+
+
+COMPRESSIONS = {
+    GZIP_COMPRESSION: gzip_stage,
+    ZSTD_COMPRESSION: zstd_stage,
+    NO_COMPRESSION: None,
+}
+
+
+def compression_available(compression):
+    if compression != ZSTD_COMPRESSION:
+        return True
+    return importlib.util.find_spec('zstandard') is not None
+
+
+def compressed_serializer(compression=GZIP_COMPRESSION):
+    stages = [CattrStage(), Stage(pickle)]
+    if COMPRESSIONS[compression]:
+        stages.append(COMPRESSIONS[compression]())
+    return SerializerPipeline(stages, name=compression, is_binary=True)
+
+
+class DbmDict(BaseStorage):
+    """Хранилище ответов в файле dbm текущего процесса."""
+
+    def __init__(self, path, serializer=None, **kwargs):
+        super().__init__(serializer=serializer, **kwargs)
+        self.lock = Lock()
+        self.db = dbm.open(str(path), 'c')
+
+    def __getitem__(self, key):
+        with self.lock:
+            value = self.db[key]
+        if not self.serializer:
+            return value.decode()
+        return self.deserialize(key, value)
+
+    def __setitem__(self, key, value):
+        value = self.serialize(value)
+        with self.lock:
+            self.db[key] = value
+
+    def __delitem__(self, key):
+        with self.lock:
+            del self.db[key]
+
+    def __iter__(self):
+        with self.lock:
+            keys = self.db.keys()
+        return (key.decode() for key in keys)
+
+    def __len__(self):
+        with self.lock:
+            return len(self.db)
+
+    def sizes(self):
+        with self.lock:
+            return {key.decode(): len(self.db[key]) for key in self.db.keys()}
+
+    def clear(self):
+        with self.lock:
+            for key in self.db.keys():
+                del self.db[key]
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+class DbmCache(BaseCache):
+    """Бэкенд requests_cache поверх dbm из стандартной библиотеки."""
+
+    def __init__(self, path, serializer=None, **kwargs):
+        super().__init__(cache_name=str(path), **kwargs)
+        path.mkdir(parents=True, exist_ok=True)
+        self.responses = DbmDict(path / 'responses', serializer=serializer)
+        self.redirects = DbmDict(path / 'redirects')
+
+
+def sqlite_cache(cache_dir, serializer):
+    return SQLiteCache(
+        cache_dir / f'{HTTP_CACHE}.sqlite', serializer=serializer, wal=True
+    )
+
+
+def filesystem_cache(cache_dir, serializer):
+    return FileCache(
+        cache_dir / HTTP_CACHE,
+        serializer=serializer,
+        decode_content=False,
+        extension=serializer.name,
+    )
+
+
+def memory_cache(cache_dir, serializer):
+    return BaseCache(HTTP_CACHE)
+
+
+def dbm_cache(cache_dir, serializer):
+    return DbmCache(cache_dir / f'{HTTP_CACHE}.dbm', serializer=serializer)
+
+
+CACHE_BACKENDS = {
+    SQLITE_BACKEND: sqlite_cache,
+    FILESYSTEM_BACKEND: filesystem_cache,
+    MEMORY_BACKEND: memory_cache,
+    DBM_BACKEND: dbm_cache,
+}
+
+
+def open_cache(backend, cache_dir, compression=GZIP_COMPRESSION):
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return CACHE_BACKENDS[backend](
+        cache_dir, compressed_serializer(compression)
+    )
+
+
+def access_log_path(backend, cache_dir):
+    if backend == MEMORY_BACKEND:
+        return None
+    return cache_dir / f'{HTTP_CACHE}.{backend}.json'
+
+
+def sqlite_sizes(storage):
+    with storage.connection() as connection:
+        return dict(connection.execute(
+            f'SELECT key, length(value) FROM {storage.table_name}'
+        ))
+
+
+def file_sizes(storage):
+    return {path.stem: path.stat().st_size for path in storage.paths()}
+
+
+def dbm_sizes(storage):
+    return storage.sizes()
+
+
+def memory_sizes(storage):
+    return {key: len(response.content) for key, response in storage.items()}
+
+
+ENTRY_SIZES = {
+    SQLiteDict: sqlite_sizes,
+    FileDict: file_sizes,
+    DbmDict: dbm_sizes,
+    DictStorage: memory_sizes,
+}
+
+
+class CacheLimiter:
+    """Учёт обращений к HTTP-кешу и вытеснение LRU сверх max_size байт."""
+
+    def __init__(self, cache, path=None, max_size=0):
+        self.cache = cache
+        self.path = path
+        self.max_size = max_size
+        state = load_state(path) if path else {}
+        self.accessed = state.get('accessed', {})
+        self.totals = Counter(state.get('totals', {}))
+        self.track()
+
+    def track(self):
+        get_response = self.cache.get_response
+        save_response = self.cache.save_response
+
+        def tracked_get_response(key, default=None):
+            response = get_response(key, default)
+            if response is not default:
+                self.touch(getattr(response, 'cache_key', None) or key)
+            return response
+
+        def tracked_save_response(response, cache_key=None, expires=None):
+            cache_key = cache_key or self.cache.create_key(response.request)
+            save_response(response, cache_key, expires)
+            self.touch(cache_key)
+
+        self.cache.get_response = tracked_get_response
+        self.cache.save_response = tracked_save_response
+        self.cache.limiter = self
+
+    def touch(self, key):
+        self.accessed[key] = time.time()
+
+    def sizes(self):
+        return ENTRY_SIZES[type(self.cache.responses)](self.cache.responses)
+
+    def trim(self):
+        if not self.max_size:
+            return 0
+        sizes = self.sizes()
+        total = sum(sizes.values())
+        evicted = []
+        for key in sorted(sizes, key=lambda key: self.accessed.get(key, 0)):
+            if total <= self.max_size:
+                break
+            total -= sizes[key]
+            evicted.append(key)
+        if evicted:
+            self.cache.delete(*evicted)
+            if isinstance(self.cache.responses, SQLiteDict):
+                self.cache.responses.vacuum()
+        self.accessed = {
+            key: self.accessed[key]
+            for key in sizes.keys() - set(evicted) if key in self.accessed
+        }
+        return len(evicted)
+
+    def clear(self):
+        self.cache.clear()
+        self.accessed = {}
+        self.totals = Counter()
+
+    def save(self, cache_stats=None):
+        self.totals.update(cache_stats or {})
+        if self.path:
+            save_state(
+                {'accessed': self.accessed, 'totals': self.totals}, self.path
+            )
+
+    def stats(self):
+        sizes = self.sizes()
+        requests = sum(self.totals.values())
+        hits = requests - self.totals.get('miss', 0)
+        return {
+            'entries': len(sizes),
+            'bytes': sum(sizes.values()),
+            'cache': dict(self.totals),
+            'cache_hit_ratio': hits / requests if requests else None,
+        }
@@ -1,132 +1,285 @@
+import copy
+import datetime as dt
 import logging
 import re
+from argparse import Namespace
 from urllib.parse import urljoin
 
-from collections import defaultdict
-import requests_cache
-from tqdm import tqdm
+from collections import namedtuple
+from functools import lru_cache, partial
 
-from configs import configure_argument_parser, configure_logging
-from constants import (BASE_DIR, DOWNLOADS, MAIN_DOC_URL, PEP_DOC_URL,)
+from archives import archive_file, download_archive, select_archives
+from configs import (configure_argument_parser, configure_logging,
+                     configure_session)
+from engines import (chain, open_parse_pool, parse_ahead, resolve_ahead,
+                     resolved, run_engine, sync_map)
+from crawler import crawl
+from exceptions import ParserFindTagException
+from extractors import (PepIndexRecord, page_links, pep_card_status,
+                        pep_index_records, whats_new_links, whats_new_record)
+from constants import (BASE_DIR, CACHES, DATETIME_FORMAT, DOWNLOADS,
+                       MAIN_DOC_URL, PARSED_CACHE, PEP_DOC_URL, PEP_STATE,
+                       PROFILES, SERVER_PORT, SNAPSHOT_FILE, SNAPSHOTS,
+                       STATES, WHATS_NEW_DEPTH)
 from outputs import control_output
-from utils import find_tag, fetch_and_parse
+from parsed_cache import ParsedCache, cached_extract, submit_extract
+from profiling import profile_table, profiler, save_profile
+from state import content_hash, load_state, save_state
+from statuses import mismatch_report, reconcile
+from utils import (CACHE_HIT, CACHE_MISS, CACHE_REVALIDATED,
+                   cache_stats, coalesced_stats, fetch_and_extract, find_tag,
+                   get_response)
 
 CANT_CONNECT = 'Невозможно подключистя {e}'
 RESPONSE_IS_NONE = 'response is None'
-UNEXPECTED_STATUS = (
-    'Несовпадающие статусы: \n'
-    '{CERTAIN_URL} \n'
-    'Статус в карточке: {certain_doc_status} \n'
-    'Ожидаемый статус: {status}'
-    ''
-)
+UNEXPECTED_STATUS = 'Несовпадающие статусы, всего {count}:\n{report}'
 UNEXPECTED_STATUS_HAS_FOUND = 'Был найден неожиданный статус'
 PARSER_STARTED = 'Парсер запущен!'
 CMD_ARGUMENTS = 'Аргументы командной строки: {args}'
 ERROR_EXPECTED = 'Произошла ошибка в процессе выполнения парсера: {e}'
+MODE_FAILED = 'Ошибка режима {mode}: {e}'
 PARSER_ENDED = 'Парсер успешно завершил свою работу'
 
+PROFILE_SUMMARY = 'Профиль работы парсера:\n{table}'
+PROFILE_HAS_SAVED = 'Профиль сохранён: {file_path}'
+
+PepRow = namedtuple('PepRow', 'number status_abbr url row_hash')
+ARCHIVE_SAVED = 'Архив сохранён: {path}, sha256 {checksum}'
+ARCHIVE_IS_UP_TO_DATE = 'Архив уже загружен: {path}'
+PEPS_REPARSED = 'Разобрано карточек PEP: {reparsed} из {total}'
+CACHE_STATS = (
+    'Кеш: попаданий {hit}, промахов {miss}, перепроверено {revalidated}'
+)
+COALESCED_STATS = (
+    'Склеено одновременных запросов: загрузок {responses}, разборов {pages}'
+)
+SNAPSHOT_SAVED = 'Снимок сохранён: {path}, адресов {count}'
+CACHE_TRIMMED = 'Из HTTP-кеша вытеснено давних ответов: {count}'
+
+
+def parsed_cache_path(cli_args):
+    cache_dir = getattr(cli_args, 'cache_dir', None) or BASE_DIR / CACHES
+    return cache_dir / PARSED_CACHE
+
+
+def open_parsed_cache(cli_args):
+    size = getattr(cli_args, 'parsed_cache_size', 0)
+    if not size:
+        return None
+    return parsed_cache_at(parsed_cache_path(cli_args), size)
+
+
+@lru_cache(maxsize=None)
+def parsed_cache_at(path, size):
+    return ParsedCache(path, size)
+
+
+def optional_record(parsed):
+    try:
+        return parsed.result()
+    except ParserFindTagException:
+        return None
+
+
+def visit_whats_new(session, parsed_cache, response, depth, follow):
+    if depth == 0:
+        return None, submit_extract(
+            session, parsed_cache, whats_new_links, response
+        )
+    record = submit_extract(session, parsed_cache, whats_new_record, response)
+    if depth > 1:
+        record = chain(record, optional_record)
+    links = (
+        submit_extract(session, parsed_cache, page_links, response)
+        if follow else []
+    )
+    return record, links
 
-def whats_new(session):
+
+def whats_new_rows(session, cli_args=None):
+    from tqdm import tqdm
     connection_errors = []
     whats_new_url = urljoin(MAIN_DOC_URL, 'whatsnew/')
-    soup = fetch_and_parse(session, whats_new_url)
-    all_notes = soup.find_all('li', attrs={'class': 'toctree-l1'})
-    tags = []
-    results = [('Ссылка на статью', 'Заголовок', 'Редактор, автор')]
-    for note in all_notes:
-        tags.append(find_tag(note, 'a'))
-    for tag in tqdm(tags):
-        href = tag['href']
-        version_link = urljoin(whats_new_url, href)
-        try:
-            soup = fetch_and_parse(session, version_link)
-            results.append(
-                (
-                    version_link,
-                    find_tag(soup, 'h1'),
-                    find_tag(soup, 'dl').text.replace('\n', ' ')
-                )
-            )
-        except ConnectionError as e:
-            connection_errors.append(CANT_CONNECT.format(e=e))
+    pages = crawl(
+        session,
+        whats_new_url,
+        partial(visit_whats_new, session, open_parsed_cache(cli_args)),
+        max_depth=getattr(cli_args, 'depth', None) or WHATS_NEW_DEPTH,
+        cli_args=cli_args,
+    )
+    yield ('Ссылка на статью', 'Заголовок', 'Редактор, автор')
+    for page in tqdm(pages, unit='page'):
+        if page.error:
+            connection_errors.append(CANT_CONNECT.format(e=page.error))
+        elif page.record is not None:
+            yield (page.url, *page.record)
     if connection_errors:
         list(map(logging.error, connection_errors))
-    return results
 
 
-def latest_versions(session):
-    soup = fetch_and_parse(session, MAIN_DOC_URL)
+def whats_new(session, cli_args=None):
+    return list(whats_new_rows(session, cli_args))
+
+
+def sidebar_versions(soup):
     sidebar = find_tag(soup, 'div', {'class': 'sphinxsidebarwrapper'})
-    ul = find_tag(sidebar, 'ul')
-    a_tags = ul.find_all('a')
-    results = [('Ссылка на статью', 'Заголовок', 'Редактор, автор')]
+    return [
+        (str(a_tag['href']), a_tag.get_text())
+        for a_tag in find_tag(sidebar, 'ul').find_all('a')
+    ]
+
+
+def latest_versions_rows(session, cli_args=None):
+    links = fetch_and_extract(session, MAIN_DOC_URL, sidebar_versions)
+    yield ('Ссылка на статью', 'Заголовок', 'Редактор, автор')
     pattern = r'Python (?P<version>\d\.\d+) \((?P<status>.*)\)'
-    for a_tag in a_tags:
-        text_match = re.search(pattern, a_tag.text)
+    for href, text in links:
+        text_match = re.search(pattern, text)
         if not text_match:
             continue
-        results.append(
-            (
-                a_tag['href'],
-                text_match.group('version'),
-                text_match.group('status')
-            )
+        yield (
+            href,
+            text_match.group('version'),
+            text_match.group('status')
         )
-    return results
 
 
-def download(session):
+def latest_versions(session, cli_args=None):
+    return list(latest_versions_rows(session, cli_args))
+
+
+def download_hrefs(soup):
+    return [
+        str(a_tag['href'])
+        for a_tag in find_tag(
+            soup, 'table', {'class': 'docutils'}
+        ).find_all('a')
+    ]
+
+
+def download(session, cli_args=None):
     downloads_url = urljoin(MAIN_DOC_URL, 'download.html')
-    soup = fetch_and_parse(session, downloads_url)
-    download_documentation_table = find_tag(
-        soup, 'table', {'class': 'docutils'}
+    archive_urls = select_archives(
+        [
+            urljoin(downloads_url, href)
+            for href in fetch_and_extract(
+                session, downloads_url, download_hrefs
+            )
+        ],
+        getattr(cli_args, 'formats', None),
+        getattr(cli_args, 'all', False),
     )
-    find_a = find_tag(download_documentation_table, 'a')
-    full_href = urljoin(downloads_url, find_a['href'])
-    filename = full_href.split('/')[-1]
     DOWNLOADS_DIR = BASE_DIR / DOWNLOADS
     DOWNLOADS_DIR.mkdir(exist_ok=True)
-    archive_path = DOWNLOADS_DIR / filename
-    response = session.get(full_href)
-    with open(archive_path, 'wb') as file:
-        file.write(response.content)
+    archive_paths = [archive_file(DOWNLOADS_DIR, url) for url in archive_urls]
+    checksums = sync_map(
+        lambda args: download_archive(session, *args),
+        zip(archive_urls, archive_paths),
+        len(archive_urls)
+    )
+    for archive_path, checksum in zip(archive_paths, checksums):
+        if checksum is None:
+            logging.info(ARCHIVE_IS_UP_TO_DATE.format(path=archive_path))
+            continue
+        logging.info(
+            ARCHIVE_SAVED.format(path=archive_path, checksum=checksum)
+        )
 
 
-def pep(session):
+def pep_index(session, parsed_cache=None):
+    records = cached_extract(
+        session, parsed_cache, pep_index_records,
+        get_response(session, PEP_DOC_URL)
+    )
+    return [
+        PepRow(
+            number=record.number,
+            status_abbr=record.status_abbr,
+            url=urljoin(PEP_DOC_URL, record.href),
+            row_hash=content_hash('\t'.join(record).encode()),
+        )
+        for record in map(PepIndexRecord._make, records)
+    ]
+
+
+def fetch_pep_entry(session, parsed_cache, state, row):
+    try:
+        response = get_response(session, row.url)
+        response_hash = content_hash(response.content)
+        known = state.get(row.number)
+        if known and known['row_hash'] == row.row_hash and (
+            known['content_hash'] == response_hash
+        ):
+            return known, None
+        return {
+            'status_abbr': row.status_abbr,
+            'row_hash': row.row_hash,
+            'card_status': submit_extract(
+                session, parsed_cache, pep_card_status, response
+            ),
+            'content_hash': response_hash,
+        }, None
+    except ConnectionError as e:
+        return None, CANT_CONNECT.format(e=e)
+
+
+def finish_pep_entry(fetched):
+    entry, error = fetched
+    if entry is not None:
+        entry['card_status'] = resolved(entry['card_status'])
+    return entry, error
+
+
+def pep_rows(session, cli_args=None):
+    from tqdm import tqdm
     connection_errors = []
-    unexpected_statuses = []
-    soup = fetch_and_parse(session, PEP_DOC_URL)
-    numerical_index = find_tag(soup, 'section', {'id': 'numerical-index'})
-    find_tr = numerical_index.find_all('tr')
-    pep_status_count = defaultdict(int)
-    for tr in tqdm(find_tr[1:]):
-        status = find_tag(tr, 'abbr')['title'].split(', ')[1]
-        CERTAIN_URL = urljoin(
-            PEP_DOC_URL, find_tag(
-                tr, 'a', {'class': 'pep reference internal'})['href']
+    incremental = getattr(cli_args, 'incremental', False)
+    state_path = BASE_DIR / STATES / PEP_STATE
+    state = load_state(state_path) if incremental else {}
+    parsed_cache = open_parsed_cache(cli_args)
+    rows = pep_index(session, parsed_cache)
+    entries = resolve_ahead(
+        run_engine(
+            partial(fetch_pep_entry, session, parsed_cache, state),
+            rows,
+            cli_args
+        ),
+        finish_pep_entry,
+        parse_ahead(cli_args)
+    )
+    reparsed = 0
+    parsed_rows = []
+    for row, (entry, error) in tqdm(zip(rows, entries), total=len(rows)):
+        if error:
+            connection_errors.append(error)
+            continue
+        reparsed += entry is not state.get(row.number)
+        state[row.number] = entry
+        parsed_rows.append(row)
+    pep_status_count, mismatches = reconcile(
+        parsed_rows,
+        [state[row.number]['card_status'] for row in parsed_rows]
+    )
+    if incremental:
+        save_state(
+            {row.number: state[row.number]
+             for row in rows if row.number in state},
+            state_path
         )
-        try:
-            soup = fetch_and_parse(session, CERTAIN_URL)
-        except ConnectionError as e:
-            connection_errors.append(CANT_CONNECT.format(e=e))
-        certain_doc_status = find_tag(soup, 'abbr').text
-        pep_status_count[certain_doc_status] += 1
-        if certain_doc_status != status:
-            unexpected_statuses.append(
-                UNEXPECTED_STATUS.format(
-                    CERTAIN_URL=CERTAIN_URL,
-                    certain_doc_status=certain_doc_status,
-                    status=status
-                ))
+        logging.info(PEPS_REPARSED.format(reparsed=reparsed, total=len(rows)))
     if connection_errors:
         logging.error(connection_errors)
-    list(map(logging.warning, unexpected_statuses))
-    return [
-        ('Статус', 'Количество'),
-        *pep_status_count.items(),
-        ('Всего', sum(pep_status_count.values())),
-    ]
+    if mismatches:
+        logging.warning(UNEXPECTED_STATUS.format(
+            count=len(mismatches), report=mismatch_report(mismatches)
+        ))
+    yield ('Статус', 'Количество')
+    yield from pep_status_count.items()
+    yield ('Всего', sum(pep_status_count.values()))
+
+
+def pep(session, cli_args=None):
+    return list(pep_rows(session, cli_args))
 
 
 MODE_TO_FUNCTION = {
@@ -135,22 +288,197 @@ MODE_TO_FUNCTION = {
     'download': download,
     'pep': pep
 }
+MODE_TO_ROWS = {
+    'whats-new': whats_new_rows,
+    'latest-versions': latest_versions_rows,
+    'pep': pep_rows,
+}
+
+
+def cache_stats_rows(session, cli_args=None):
+    stats = session.cache.limiter.stats()
+    ratio = stats['cache_hit_ratio']
+    return [
+        ('Показатель', 'Значение'),
+        ('Записей', stats['entries']),
+        ('Байт', stats['bytes']),
+        ('Попаданий', stats['cache'].get(CACHE_HIT, 0)),
+        ('Промахов', stats['cache'].get(CACHE_MISS, 0)),
+        ('Перепроверено', stats['cache'].get(CACHE_REVALIDATED, 0)),
+        ('Доля попаданий', None if ratio is None else round(ratio, 3)),
+    ]
+
+
+def snapshot_build(session, cli_args=None):
+    from snapshot import SnapshotWriter, snapshot_recorder
+    path = (
+        getattr(cli_args, 'snapshot_output', None)
+        or BASE_DIR / SNAPSHOTS / SNAPSHOT_FILE
+    )
+    download_args = copy.copy(cli_args) if cli_args else Namespace()
+    download_args.all = True
+    archives = {}
+    with SnapshotWriter(path) as writer:
+        recorder = snapshot_recorder(writer, archives)
+        session.hooks['response'].append(recorder)
+        try:
+            for mode in ('whats-new', 'latest-versions', 'pep'):
+                MODE_TO_FUNCTION[mode](session, cli_args)
+            download(session, download_args)
+        finally:
+            session.hooks['response'].remove(recorder)
+        for url, headers in archives.items():
+            writer.add_file(
+                url, archive_file(BASE_DIR / DOWNLOADS, url), headers
+            )
+    logging.info(SNAPSHOT_SAVED.format(path=path, count=len(writer)))
+
+
+COMMAND_TO_ROWS = {
+    'cache-stats': cache_stats_rows,
+}
+
+
+def serve_modes(session, cli_args=None):
+    from server import serve
+    serve(
+        session,
+        {**MODE_TO_ROWS, 'download': download, **COMMAND_TO_ROWS},
+        getattr(cli_args, 'port', SERVER_PORT),
+    )
+
+
+def run_remote(cli_args):
+    from server import query_server
+    rows = query_server(cli_args.server, cli_args)
+    if rows is not None:
+        control_output(rows, cli_args)
+
+
+COMMAND_TO_FUNCTION = {
+    'snapshot-build': snapshot_build,
+    'serve': serve_modes,
+}
+ALL_MODES = 'all'
+
+
+def expand_modes(modes):
+    expanded = []
+    for mode in modes:
+        for name in MODE_TO_FUNCTION if mode == ALL_MODES else (mode,):
+            if name not in expanded:
+                expanded.append(name)
+    return expanded
+
+
+def mode_args(cli_args, mode):
+    single_mode_args = copy.copy(cli_args)
+    single_mode_args.mode = mode
+    return single_mode_args
+
+
+def run_mode(session, cli_args):
+    rows_function = {**MODE_TO_ROWS, **COMMAND_TO_ROWS}.get(cli_args.mode)
+    if rows_function:
+        return rows_function(session, cli_args)
+    {**MODE_TO_FUNCTION, **COMMAND_TO_FUNCTION}[cli_args.mode](
+        session, cli_args
+    )
+    return None
+
+
+def run_modes(session, cli_args):
+    modes = [mode_args(cli_args, mode) for mode in expand_modes(cli_args.mode)]
+    if len(modes) == 1:
+        results = [(run_mode(session, modes[0]), None)]
+    else:
+        results = sync_map(
+            partial(materialize_mode, session), modes, len(modes)
+        )
+    for args, (rows, error) in zip(modes, results):
+        if error is not None:
+            logging.error(
+                MODE_FAILED.format(mode=args.mode, e=error), exc_info=error
+            )
+        elif rows is not None:
+            control_output(rows, args)
+
+
+def materialize_mode(session, cli_args):
+    """Строки режима целиком; ошибка одного режима не отменяет остальные."""
+    try:
+        rows = run_mode(session, cli_args)
+        return None if rows is None else list(rows), None
+    except Exception as e:
+        return None, e
+
+
+def save_run_profile(cli_args):
+    report = profiler.report(cache_stats)
+    report['coalesced'] = dict(coalesced_stats)
+    logging.info(PROFILE_SUMMARY.format(table=profile_table(report)))
+    file_path = (
+        BASE_DIR / PROFILES /
+        f'{"+".join(expand_modes(cli_args.mode))}_'
+        f'{dt.datetime.now().strftime(DATETIME_FORMAT)}.json'
+    )
+    save_profile(report, file_path)
+    logging.info(PROFILE_HAS_SAVED.format(file_path=file_path))
+
+
+def save_cache_usage(session):
+    limiter = session.cache.limiter
+    evicted = limiter.trim()
+    if evicted:
+        logging.info(CACHE_TRIMMED.format(count=evicted))
+    limiter.save(cache_stats)
 
 
 def main():
     try:
         configure_logging()
         logging.info(PARSER_STARTED)
-        arg_parser = configure_argument_parser(MODE_TO_FUNCTION.keys())
+        commands = (*COMMAND_TO_ROWS, *COMMAND_TO_FUNCTION)
+        arg_parser = configure_argument_parser(
+            (*MODE_TO_FUNCTION, ALL_MODES, *commands), commands
+        )
         args = arg_parser.parse_args()
         logging.info(CMD_ARGUMENTS.format(args=args))
-        session = requests_cache.CachedSession()
-        if args.clear_cache:
-            session.cache.clear()
-        parser_mode = args.mode
-        results = MODE_TO_FUNCTION[parser_mode](session)
-        if results is not None:
-            control_output(results, args)
+        if args.server:
+            from server import SERVER_IGNORES_ARGS, ignored_args
+            ignored = ignored_args(args, arg_parser)
+            if ignored:
+                logging.warning(SERVER_IGNORES_ARGS.format(
+                    args=', '.join(ignored)
+                ))
+            for mode in expand_modes(args.mode):
+                run_remote(mode_args(args, mode))
+            logging.info(PARSER_ENDED)
+            return
+        profiler.enabled = args.profile
+        session = configure_session(args)
+        session.parse_pool = open_parse_pool(args.parse_procs)
+        try:
+            if args.clear_cache:
+                session.cache.limiter.clear()
+            if args.clear_cache or args.clear_parsed_cache:
+                ParsedCache(parsed_cache_path(args), 0).clear()
+            run_modes(session, args)
+        finally:
+            if session.parse_pool is not None:
+                session.parse_pool.shutdown()
+        logging.info(CACHE_STATS.format(
+            hit=cache_stats[CACHE_HIT],
+            miss=cache_stats[CACHE_MISS],
+            revalidated=cache_stats[CACHE_REVALIDATED],
+        ))
+        logging.info(COALESCED_STATS.format(
+            responses=coalesced_stats['get_response'],
+            pages=coalesced_stats['fetch_and_extract'],
+        ))
+        save_cache_usage(session)
+        if args.profile:
+            save_run_profile(args)
         logging.info(PARSER_ENDED)
     except Exception as e:
         logging.exception(ERROR_EXPECTED.format(e=e))
@@ -1,21 +1,24 @@
 import csv
 import datetime as dt
+import json
 import logging
 
-from prettytable import PrettyTable
-
-from constants import (BASE_DIR, DATETIME_FORMAT, FILE_OUTPUT,
-                       PRETTY_FILEDATA, RESULTS)
+from columnar import columnar_extension, write_columnar
+from constants import (BASE_DIR, COLUMNAR_OUTPUT, DATETIME_FORMAT,
+                       FILE_OUTPUT, JSONL_OUTPUT, PRETTY_FILEDATA, RESULTS)
+from profiling import profiled, profiler
 
 FILE_HAS_SAVED = 'Файл с результатами был сохранён: {file_path}'
 
 
 def default_output(results, cli_args=None):
     for row in results:
-        print(*row)
+        print(*row, flush=True)
 
 
 def pretty_output(results, cli_args=None):
+    from prettytable import PrettyTable
+    results = list(results)
     table = PrettyTable()
     table.field_names = results[0]
     table.align = 'l'
@@ -23,18 +26,43 @@ def pretty_output(results, cli_args=None):
     print(table)
 
 
-def file_output(results, cli_args):
+def results_file_path(cli_args, extension):
     results_dir = BASE_DIR / RESULTS
     results_dir.mkdir(exist_ok=True)
     parser_mode = cli_args.mode
-    file_path = (
+    return (
             results_dir /
             f'{parser_mode}_'
             f'{dt.datetime.now().strftime(DATETIME_FORMAT)}'
-            f'.csv'
+            f'.{extension}'
     )
+
+
+def file_output(results, cli_args):
+    file_path = results_file_path(cli_args, 'csv')
     with open(file_path, 'w', encoding='utf-8') as f:
-        csv.writer(f).writerows(results)
+        writer = csv.writer(f)
+        for row in results:
+            writer.writerow(row)
+            f.flush()
+    logging.info(FILE_HAS_SAVED.format(file_path=file_path))
+
+
+def jsonl_output(results, cli_args):
+    file_path = results_file_path(cli_args, 'jsonl')
+    results = iter(results)
+    header = next(results)
+    with open(file_path, 'w', encoding='utf-8') as f:
+        for row in results:
+            f.write(json.dumps(dict(zip(header, row)), ensure_ascii=False))
+            f.write('\n')
+            f.flush()
+    logging.info(FILE_HAS_SAVED.format(file_path=file_path))
+
+
+def columnar_output(results, cli_args):
+    file_path = results_file_path(cli_args, columnar_extension())
+    write_columnar(file_path, list(results))
     logging.info(FILE_HAS_SAVED.format(file_path=file_path))
 
 
@@ -42,8 +70,13 @@ OUTPUT_FUNCTIONS = {
     None: default_output,
     PRETTY_FILEDATA: pretty_output,
     FILE_OUTPUT: file_output,
+    JSONL_OUTPUT: jsonl_output,
+    COLUMNAR_OUTPUT: columnar_output,
 }
 
 
 def control_output(results, cli_args):
-    OUTPUT_FUNCTIONS[cli_args.output](results, cli_args)
+    output_function = OUTPUT_FUNCTIONS[cli_args.output]
+    profiled(f'output:{output_function.__name__}')(output_function)(
+        profiler.exclude(results) if profiler.enabled else results, cli_args
+    )
@@ -0,0 +1,116 @@
+import json
+import sqlite3
+import time
+from threading import Lock
+
+from engines import completed, parse_pool, parse_result, submit_parser
+from extractors import EXTRACTORS_VERSION
+from state import content_hash
+from utils import parse_flight
+
+CREATE_TABLE = (
+    'CREATE TABLE IF NOT EXISTS parsed '
+    '(key TEXT PRIMARY KEY, value TEXT, accessed REAL)'
+)
+
+
+class ParsedCache:
+    """Кеш извлечённых со страниц записей с вытеснением LRU."""
+
+    def __init__(self, path, max_entries):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.lock = Lock()
+        self.connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute(CREATE_TABLE)
+        self.size = len(self)
+
+    def __len__(self):
+        return self.connection.execute(
+            'SELECT COUNT(*) FROM parsed'
+        ).fetchone()[0]
+
+    def get(self, key):
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT value FROM parsed WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.connection.execute(
+                'UPDATE parsed SET accessed = ? WHERE key = ?',
+                (time.time(), key)
+            )
+        value = json.loads(row[0])
+        return tuple(value) if isinstance(value, list) else value
+
+    def set(self, key, value):
+        with self.lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO parsed VALUES (?, ?, ?)',
+                (key, json.dumps(value, ensure_ascii=False), time.time())
+            )
+            self.size += 1
+            if self.size > self.max_entries:
+                self.evict()
+
+    def evict(self):
+        self.size = len(self)
+        excess = self.size - self.max_entries
+        if excess <= 0:
+            return
+        self.connection.execute(
+            'DELETE FROM parsed WHERE key IN ('
+            'SELECT key FROM parsed ORDER BY accessed LIMIT ?)',
+            (excess,)
+        )
+        self.size -= excess
+
+    def clear(self):
+        with self.lock:
+            self.connection.execute('DELETE FROM parsed')
+            self.size = 0
+
+
+def response_key(response, extractor):
+    version = response.headers.get('ETag') or content_hash(response.content)
+    return (
+        f'{response.url}|{version}|{extractor.__name__}|{EXTRACTORS_VERSION}'
+    )
+
+
+def submit_extract(session, parsed_cache, extractor, response):
+    """Future с записью извлекателя: из кеша разбора или из нового разбора.
+
+    Одновременные разборы одного ответа в одной сессии склеиваются.
+    """
+    key = response_key(response, extractor)
+    if parsed_cache is not None:
+        value = parsed_cache.get(key)
+        if value is not None:
+            return completed(value)
+
+    def store(parsed):
+        if parsed.exception() is None:
+            parsed_cache.set(key, parsed.result())
+
+    def start():
+        parsed = submit_parser(
+            parse_pool(session), extractor, response.content,
+            response.encoding
+        )
+        if parsed_cache is not None:
+            parsed.add_done_callback(store)
+        return parsed
+
+    return parse_flight.submit((id(session), key), start)
+
+
+def cached_extract(session, parsed_cache, extractor, response):
+    return parse_result(
+        submit_extract(session, parsed_cache, extractor, response)
+    )
@@ -0,0 +1,130 @@
+import json
+import math
+import time
+from collections import defaultdict
+from functools import wraps
+from threading import Lock, local
+
+PERCENTILES = (50, 95, 99)
+PROFILE_FIELDS = (
+    'Фаза', 'Вызовы', 'Всего, с', 'p50, мс', 'p95, мс', 'p99, мс'
+)
+
+
+def percentile(values, percent):
+    return values[max(math.ceil(percent / 100 * len(values)) - 1, 0)]
+
+
+class Profiler:
+    """Собирает длительности фаз и объём загруженных данных."""
+
+    def __init__(self):
+        self.enabled = False
+        self.lock = Lock()
+        self.local = local()
+        self.timings = defaultdict(list)
+        self.transferred = 0
+
+    def record(self, phase, seconds):
+        with self.lock:
+            self.timings[phase].append(seconds)
+
+    def merge(self, timings):
+        with self.lock:
+            for phase, seconds in timings.items():
+                self.timings[phase].extend(seconds)
+
+    def add_bytes(self, size):
+        with self.lock:
+            self.transferred += size
+
+    def excluded(self):
+        return getattr(self.local, 'excluded', 0.0)
+
+    def exclude(self, iterable):
+        """Не засчитывает в фазу время, потраченное на получение строк."""
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.local.excluded = (
+                    self.excluded() + time.perf_counter() - start
+                )
+            yield item
+
+    def reset(self):
+        with self.lock:
+            self.timings.clear()
+            self.transferred = 0
+
+    def report(self, cache_stats=None):
+        phases = {}
+        with self.lock:
+            for phase, timings in self.timings.items():
+                ordered = sorted(timings)
+                phases[phase] = {
+                    'count': len(ordered),
+                    'total': sum(ordered),
+                    **{
+                        f'p{percent}': percentile(ordered, percent)
+                        for percent in PERCENTILES
+                    },
+                }
+            transferred = self.transferred
+        cache_stats = dict(cache_stats or {})
+        requests = sum(cache_stats.values())
+        hits = requests - cache_stats.get('miss', 0)
+        return {
+            'phases': phases,
+            'bytes': transferred,
+            'cache': cache_stats,
+            'cache_hit_ratio': hits / requests if requests else None,
+        }
+
+
+profiler = Profiler()
+
+
+def profiled(phase):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            excluded = profiler.excluded()
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.record(
+                    phase,
+                    time.perf_counter() - start
+                    - (profiler.excluded() - excluded)
+                )
+        return wrapper
+    return decorator
+
+
+def profile_table(report):
+    from prettytable import PrettyTable
+    table = PrettyTable()
+    table.field_names = PROFILE_FIELDS
+    table.align = 'l'
+    for phase, stats in sorted(report['phases'].items()):
+        table.add_row((
+            phase,
+            stats['count'],
+            f"{stats['total']:.3f}",
+            *(f"{stats[f'p{percent}'] * 1000:.2f}" for percent in PERCENTILES)
+        ))
+    return table
+
+
+def save_profile(report, file_path):
+    file_path.parent.mkdir(exist_ok=True)
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,115 @@
+import json
+import logging
+import time
+from argparse import Namespace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from constants import SERVER_HOST, SERVER_PORT
+
+SERVER_STARTED = 'Сервер парсера запущен: http://{host}:{port}/'
+SERVER_STOPPED = 'Сервер парсера остановлен'
+UNKNOWN_MODE = 'Неизвестный режим {mode}'
+MODE_FAILED = 'Ошибка режима {mode}: {e}'
+SERVER_ERROR = 'Сервер парсера вернул ошибку {status}: {error}'
+SERVER_IGNORES_ARGS = (
+    'Сервер парсера работает со своей сессией и кешем, аргументы {args} '
+    'не применяются'
+)
+LOCAL_ARGS = ('server', 'output', 'profile')
+MODE_ARGS = (
+    'parsed_cache_size', 'workers', 'depth', 'incremental', 'formats', 'all',
+)
+
+
+class ParserHandler(BaseHTTPRequestHandler):
+    """Выполняет режим из пути POST-запроса и отдаёт строки в JSON."""
+
+    protocol_version = 'HTTP/1.1'
+    session = None
+    modes = {}
+
+    def do_POST(self):
+        mode = self.path.strip('/')
+        length = int(self.headers.get('Content-Length', 0))
+        cli_args = Namespace(**json.loads(self.rfile.read(length) or b'{}'))
+        cli_args.mode = mode
+        if mode not in self.modes:
+            self.send_json(404, {'error': UNKNOWN_MODE.format(mode=mode)})
+            return
+        start = time.perf_counter()
+        try:
+            rows = self.modes[mode](self.session, cli_args)
+            status = 200
+            payload = {'rows': None if rows is None else list(rows)}
+        except Exception as e:
+            logging.exception(MODE_FAILED.format(mode=mode, e=e))
+            status, payload = 500, {'error': str(e)}
+        payload['elapsed'] = time.perf_counter() - start
+        self.send_json(status, payload)
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.info(format, *args)
+
+
+def create_server(session, modes, host=SERVER_HOST, port=SERVER_PORT):
+    handler = type('Handler', (ParserHandler,), {
+        'session': session, 'modes': modes,
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(session, modes, port=SERVER_PORT):
+    server = create_server(session, modes, port=port)
+    logging.info(SERVER_STARTED.format(
+        host=server.server_address[0], port=server.server_address[1]
+    ))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        logging.info(SERVER_STOPPED)
+
+
+def ignored_args(cli_args, arg_parser):
+    """Аргументы сессии и кеша, заданные не по умолчанию: сервер их не
+    применит, у него сессия из аргументов его запуска."""
+    return [
+        key for key, value in vars(cli_args).items()
+        if key not in (*MODE_ARGS, *LOCAL_ARGS, 'mode')
+        and value != arg_parser.get_default(key)
+    ]
+
+
+def query_server(url, cli_args):
+    payload = {
+        key: value for key, value in vars(cli_args).items()
+        if key in MODE_ARGS
+    }
+    request = Request(
+        f'{url.rstrip("/")}/{cli_args.mode}',
+        data=json.dumps(payload, default=str).encode(),
+        headers={'Content-Type': 'application/json'},
+        method='POST',
+    )
+    try:
+        with urlopen(request) as response:
+            rows = json.load(response)['rows']
+    except HTTPError as e:
+        raise ConnectionError(SERVER_ERROR.format(
+            status=e.code, error=json.load(e).get('error')
+        )) from e
+    return None if rows is None else [tuple(row) for row in rows]
@@ -0,0 +1,296 @@
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
+import zlib
+from collections import namedtuple
+from threading import Lock
+
+from requests.adapters import BaseAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3 import HTTPResponse
+
+from archives import NO_STORE
+from constants import CHUNK_SIZE
+from exceptions import SnapshotFormatException
+
+MAGIC = b'PSNAP1\n\x00'
+HEADER = struct.Struct('<8sQQ')
+SLOT = struct.Struct('<QQ')
+RECORD = struct.Struct('<HHIQQ')
+ZLIB_LEVEL = 6
+KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Location')
+NOT_FOUND = 404
+PARTIAL_CONTENT = 206
+RANGE_NOT_SATISFIABLE = 416
+RANGE_PREFIX = 'bytes='
+BAD_MAGIC = 'Файл {path} не является снимком страниц парсера'
+NOT_IN_SNAPSHOT = 'Not in snapshot'
+
+SnapshotEntry = namedtuple(
+    'SnapshotEntry', 'url status headers body_offset body_length size'
+)
+
+
+def url_hash(url):
+    return int.from_bytes(
+        hashlib.blake2b(url.encode(), digest_size=8).digest(), 'little'
+    )
+
+
+def kept_headers(headers):
+    return {name: headers[name] for name in KEPT_HEADERS if name in headers}
+
+
+class SnapshotWriter:
+    """Пишет страницы в снимок: сжатые тела и хеш-таблица адресов в конце."""
+
+    def __init__(self, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.temp_path = path.with_name(path.name + '.tmp')
+        self.file = open(self.temp_path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, 0, 0))
+        self.offsets = {}
+        self.lock = Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.file.close()
+            os.remove(self.temp_path)
+
+    def __contains__(self, url):
+        return url in self.offsets
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def add(self, url, status, headers, chunks):
+        url_bytes = url.encode()
+        header_bytes = json.dumps(headers).encode()
+        with self.lock:
+            if url in self.offsets:
+                return
+            offset = self.file.tell()
+            self.file.write(RECORD.pack(0, 0, 0, 0, 0))
+            self.file.write(url_bytes + header_bytes)
+            compressor = zlib.compressobj(ZLIB_LEVEL)
+            body_length = size = 0
+            for chunk in chunks:
+                size += len(chunk)
+                body_length += self.file.write(compressor.compress(chunk))
+            body_length += self.file.write(compressor.flush())
+            self.file.seek(offset)
+            self.file.write(RECORD.pack(
+                status, len(url_bytes), len(header_bytes), body_length, size
+            ))
+            self.file.seek(0, os.SEEK_END)
+            self.offsets[url] = offset
+
+    def add_file(self, url, path, headers=None):
+        with open(path, 'rb') as f:
+            self.add(
+                url, 200, headers or {},
+                iter(lambda: f.read(CHUNK_SIZE), b'')
+            )
+
+    def close(self):
+        slots = 8
+        while slots < 2 * len(self.offsets):
+            slots *= 2
+        table = bytearray(slots * SLOT.size)
+        for url, offset in self.offsets.items():
+            digest = url_hash(url)
+            slot = digest & (slots - 1)
+            while SLOT.unpack_from(table, slot * SLOT.size)[1]:
+                slot = (slot + 1) & (slots - 1)
+            SLOT.pack_into(table, slot * SLOT.size, digest, offset)
+        index_offset = self.file.tell()
+        self.file.write(table)
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, index_offset, slots))
+        self.file.close()
+        os.replace(self.temp_path, self.path)
+
+
+class SnapshotBody(io.RawIOBase):
+    """Тело ответа из снимка, распаковываемое по мере чтения."""
+
+    def __init__(self, buffer, offset, length):
+        self.buffer = buffer
+        self.position = offset
+        self.end = offset + length
+        self.decompressor = zlib.decompressobj()
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        data = b''
+        while not data and not self.decompressor.eof:
+            source = self.decompressor.unconsumed_tail
+            if not source:
+                if self.position >= self.end:
+                    break
+                source = self.buffer[
+                    self.position:min(self.position + CHUNK_SIZE, self.end)
+                ]
+                self.position += len(source)
+            data = self.decompressor.decompress(source, len(b))
+        b[:len(data)] = data
+        return len(data)
+
+    def skip(self, count):
+        buffer = bytearray(min(count, CHUNK_SIZE) or 1)
+        while count:
+            read = self.readinto(memoryview(buffer)[:min(count, CHUNK_SIZE)])
+            if not read:
+                break
+            count -= read
+
+
+class Snapshot:
+    """Снимок страниц, открытый через mmap: поиск по адресу за O(1)."""
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:len(MAGIC)] != MAGIC or len(self.map) < HEADER.size:
+            self.close()
+            raise SnapshotFormatException(BAD_MAGIC.format(path=path))
+        _, self.index_offset, self.slots = HEADER.unpack_from(self.map)
+
+    def find(self, url):
+        digest = url_hash(url)
+        slot = digest & (self.slots - 1)
+        while True:
+            slot_hash, offset = SLOT.unpack_from(
+                self.map, self.index_offset + slot * SLOT.size
+            )
+            if not offset:
+                return None
+            if slot_hash == digest:
+                entry = self.entry(offset)
+                if entry.url == url:
+                    return entry
+            slot = (slot + 1) & (self.slots - 1)
+
+    def entry(self, offset):
+        status, url_length, headers_length, body_length, size = (
+            RECORD.unpack_from(self.map, offset)
+        )
+        start = offset + RECORD.size
+        headers_start = start + url_length
+        body_offset = headers_start + headers_length
+        return SnapshotEntry(
+            url=self.map[start:headers_start].decode(),
+            status=status,
+            headers=json.loads(self.map[headers_start:body_offset]),
+            body_offset=body_offset,
+            body_length=body_length,
+            size=size,
+        )
+
+    def body(self, entry):
+        return SnapshotBody(self.map, entry.body_offset, entry.body_length)
+
+    def read(self, url):
+        entry = self.find(url)
+        return None if entry is None else self.body(entry).read()
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+
+def range_start(value):
+    if not value or not value.startswith(RANGE_PREFIX):
+        return 0
+    start, _, _ = value[len(RANGE_PREFIX):].partition('-')
+    return int(start) if start.isdigit() else 0
+
+
+def snapshot_response(request, entry, snapshot):
+    status, headers, body = NOT_FOUND, {}, io.BytesIO()
+    offset = range_start(request.headers.get('Range'))
+    if_range = request.headers.get('If-Range')
+    if entry is not None and if_range and if_range not in (
+        entry.headers.get('ETag'), entry.headers.get('Last-Modified')
+    ):
+        offset = 0
+    if entry is not None and offset and offset >= entry.size:
+        status = RANGE_NOT_SATISFIABLE
+        headers = {'Content-Range': f'bytes */{entry.size}'}
+    elif entry is not None:
+        status = PARTIAL_CONTENT if offset else entry.status
+        headers = {**entry.headers, 'Content-Length': str(entry.size - offset)}
+        if offset:
+            headers['Content-Range'] = (
+                f'bytes {offset}-{entry.size - 1}/{entry.size}'
+            )
+        if request.method != 'HEAD':
+            body = snapshot.body(entry)
+            body.skip(offset)
+    response = Response()
+    response.request = request
+    response.url = request.url
+    response.status_code = status
+    response.headers = CaseInsensitiveDict(headers)
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.reason = NOT_IN_SNAPSHOT if entry is None else None
+    response.raw = HTTPResponse(
+        body=body,
+        headers=headers,
+        status=status,
+        preload_content=False,
+        decode_content=False,
+        request_method=request.method,
+        request_url=request.url,
+    )
+    return response
+
+
+class SnapshotAdapter(BaseAdapter):
+    """Транспорт requests, отвечающий страницами из снимка вместо сети."""
+
+    def __init__(self, snapshot):
+        super().__init__()
+        self.snapshot = snapshot
+
+    def send(self, request, stream=False, timeout=None, verify=True,
+             cert=None, proxies=None):
+        response = snapshot_response(
+            request, self.snapshot.find(request.url), self.snapshot
+        )
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
+
+
+def snapshot_recorder(writer, archives):
+    def record(response, *args, **kwargs):
+        request = response.request
+        if request.method != 'GET' or (
+            request.headers.get('Cache-Control') == NO_STORE['Cache-Control']
+        ):
+            archives[response.url] = kept_headers(response.headers)
+            return response
+        for hop in (*response.history, response):
+            if hop.status_code < 400 and hop.url not in writer:
+                writer.add(
+                    hop.url, hop.status_code,
+                    kept_headers(hop.headers), [hop.content]
+                )
+        return response
+    return record
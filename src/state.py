@@ -0,0 +1,29 @@
+import hashlib
+import json
+import os
+from threading import Lock
+
+state_lock = Lock()
+
+
+def content_hash(content):
+    return hashlib.sha1(content).hexdigest()
+
+
+def load_state(path):
+    with state_lock:
+        if not path.exists():
+            return {}
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+
+def save_state(state, path):
+    """Атомарная запись: общий временный файл защищён блокировкой, иначе
+    параллельные запросы к серверу парсера пишут в него одновременно."""
+    with state_lock:
+        path.parent.mkdir(exist_ok=True)
+        temp_path = path.with_suffix(path.suffix + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(temp_path, path)
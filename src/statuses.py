@@ -0,0 +1,75 @@
+from array import array
+from collections import namedtuple
+from itertools import compress
+from operator import attrgetter
+
+from constants import EXPECTED_STATUS
+
+CODE_TYPECODE = 'I'
+BYTE_CODES = 256
+MISMATCH_ROW = 'PEP {number}: ожидался {expected}, в карточке {actual} ({url})'
+
+StatusMismatch = namedtuple('StatusMismatch', 'number url expected actual')
+Reconciliation = namedtuple('Reconciliation', 'counts mismatches')
+
+
+def intern_codes(names):
+    """Заменяет значения малыми целыми кодами по порядку первого появления.
+
+    Пока кодов не больше 256, они лежат в bytes: count и translate
+    проходят по ним без создания объектов на каждый элемент.
+    """
+    table = list(dict.fromkeys(names))
+    codes = {name: code for code, name in enumerate(table)}
+    packed = map(codes.__getitem__, names)
+    if len(table) <= BYTE_CODES:
+        return table, bytes(packed)
+    return table, array(CODE_TYPECODE, packed)
+
+
+def lookup(codes, table):
+    """Значения таблицы по массиву кодов; для кодов-bytes через translate."""
+    if isinstance(codes, bytes):
+        return codes.translate(table.ljust(BYTE_CODES, b'\0'))
+    return map(table.__getitem__, codes)
+
+
+def reconcile(rows, statuses):
+    """Сверяет статусы карточек с аббревиатурами индекса по EXPECTED_STATUS.
+
+    Каждая пара (аббревиатура, статус) получает код, дальше работа идёт
+    только с массивом кодов: подсчёт — по одному count на пару,
+    несовпадения — выборка по таблице «пара не ожидалась».
+    """
+    pairs, codes = intern_codes(
+        list(zip(map(attrgetter('status_abbr'), rows), statuses))
+    )
+    counts = {}
+    for code, (_, status) in enumerate(pairs):
+        counts[status] = counts.get(status, 0) + codes.count(code)
+    unexpected = bytes(
+        status not in EXPECTED_STATUS.get(abbr, ()) for abbr, status in pairs
+    )
+    mismatched = compress(range(len(codes)), lookup(codes, unexpected))
+    mismatches = []
+    for index in mismatched:
+        abbr, status = pairs[codes[index]]
+        mismatches.append(StatusMismatch(
+            number=rows[index].number,
+            url=rows[index].url,
+            expected=EXPECTED_STATUS.get(abbr, ()),
+            actual=status,
+        ))
+    return Reconciliation(counts, mismatches)
+
+
+def mismatch_report(mismatches):
+    return '\n'.join(
+        MISMATCH_ROW.format(
+            number=mismatch.number,
+            expected=', '.join(mismatch.expected) or '—',
+            actual=mismatch.actual,
+            url=mismatch.url,
+        )
+        for mismatch in mismatches
+    )
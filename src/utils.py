@@ -1,19 +1,150 @@
-from bs4 import BeautifulSoup
+from collections import Counter
+from concurrent.futures import Future
+from threading import Lock
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
 from exceptions import ParserFindTagException
+from profiling import profiled, profiler
 
 ERROR_LOADING_PAGE = 'Возникла ошибка при загрузке страницы {url}: {e}'
 ERROR_MESSAGE = 'Не найден тег {tag} {attrs}'
+CACHE_HIT = 'hit'
+CACHE_MISS = 'miss'
+CACHE_REVALIDATED = 'revalidated'
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+cache_stats = Counter()
+cache_stats_lock = Lock()
+coalesced_stats = Counter()
+
+
+def count_cache_result(response):
+    if getattr(response, 'revalidated', False):
+        result = CACHE_REVALIDATED
+    elif getattr(response, 'from_cache', False):
+        result = CACHE_HIT
+    else:
+        result = CACHE_MISS
+    with cache_stats_lock:
+        cache_stats[result] += 1
+
+
+def normalize_url(url):
+    """Приводит адрес к одному виду: для кеша, снимка и склейки запросов."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if ':' in host:
+        host = f'[{host}]'
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f'{host}:{parts.port}'
+    if parts.username:
+        host = f'{parts.netloc.rpartition("@")[0]}@{host}'
+    path = urljoin('/', parts.path) if host else parts.path
+    return urlunsplit((scheme, host, path, parts.query, ''))
+
+
+class SingleFlight:
+    """Одна загрузка на ключ: параллельные вызовы ждут её и делят итог.
+
+    Ключ живёт только пока загрузка идёт, готовые результаты не хранятся —
+    это дело HTTP-кеша.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.lock = Lock()
+        self.flights = {}
+
+    def do(self, key, load):
+        with self.lock:
+            flight = self.flights.get(key)
+            if flight is None:
+                flight = self.flights[key] = Future()
+                leader = True
+            else:
+                coalesced_stats[self.name] += 1
+                leader = False
+        if not leader:
+            return flight.result()
+        try:
+            result = load()
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            with self.lock:
+                del self.flights[key]
+
+    def submit(self, key, start):
+        """Как do, но без ожидания: start запускает работу и отдаёт Future.
+
+        Ключ живёт, пока эта Future не завершится, и все вызовы с ним
+        получают одну общую Future.
+        """
+        with self.lock:
+            flight = self.flights.get(key)
+            if flight is not None:
+                coalesced_stats[self.name] += 1
+                return flight
+            flight = self.flights[key] = Future()
 
+        def land(started):
+            with self.lock:
+                del self.flights[key]
+            if started.exception() is None:
+                flight.set_result(started.result())
+            else:
+                flight.set_exception(started.exception())
 
+        try:
+            started = start()
+        except Exception as e:
+            started = Future()
+            started.set_exception(e)
+        started.add_done_callback(land)
+        return flight
+
+
+response_flight = SingleFlight('get_response')
+parse_flight = SingleFlight('fetch_and_extract')
+
+
+@profiled('get_response')
 def get_response(session, url, encoding='utf-8'):
+    url = normalize_url(url)
+    return response_flight.do(
+        (id(session), url, encoding),
+        lambda: load_response(session, url, encoding)
+    )
+
+
+def wire_size(response):
+    """Байты тела, пришедшие по сети: до распаковки gzip/br."""
+    size = getattr(response.raw, 'tell', lambda: 0)()
+    if size:
+        return size
+    length = response.headers.get('Content-Length', '')
+    return int(length) if length.isdigit() else len(response.content)
+
+
+def load_response(session, url, encoding):
     try:
         response = session.get(url)
+        response.raise_for_status()
         response.encoding = encoding
+        count_cache_result(response)
+        if profiler.enabled and not getattr(response, 'from_cache', False):
+            profiler.add_bytes(wire_size(response))
         return response
     except Exception as e:
-        ConnectionError(ERROR_LOADING_PAGE.format(url=url, e=e))
+        raise ConnectionError(ERROR_LOADING_PAGE.format(url=url, e=e)) from e
 
 
+@profiled('find_tag')
 def find_tag(soup, tag, attrs=None):
     searched_tag = soup.find(tag, attrs=(attrs or {}))
     if searched_tag is None:
@@ -23,5 +154,27 @@ def find_tag(soup, tag, attrs=None):
     return searched_tag
 
 
-def fetch_and_parse(session, url, encoding='utf-8', features='lxml'):
-    return BeautifulSoup(get_response(session, url, encoding).text, features)
+def parse_response(response, features='lxml'):
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(response.text, features)
+
+
+@profiled('fetch_and_extract')
+def fetch_and_extract(session, url, extract, encoding='utf-8',
+                      features='lxml'):
+    """Извлекает из страницы простые данные и сразу освобождает дерево.
+
+    extract получает soup и должен вернуть строки, а не Tag: после
+    него дерево разбирается через decompose.
+    """
+    url = normalize_url(url)
+    key = (url, encoding, features, extract)
+
+    def load():
+        soup = parse_response(get_response(session, url, encoding), features)
+        try:
+            return extract(soup)
+        finally:
+            soup.decompose()
+
+    return parse_flight.do((id(session), *key), load)
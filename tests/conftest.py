@@ -1,5 +1,9 @@
-import pytest
+import re
 import sys
+import time
+from contextlib import contextmanager
+
+import pytest
 from pathlib import Path
 from bs4 import BeautifulSoup
 import requests_mock
@@ -110,3 +114,48 @@ def records():
         result = results[mode]
         return converting(result)
     return _records
+
+
+MOCK_PEP_URL = 'https://peps.python.org/'
+
+
+def get_pep_adapter(count: int, delay: float = 0) -> Adapter:
+    from tests.fixture_data.pages import (
+        pep_card_page, pep_index_page, pep_rows
+    )
+
+    def card(request, context):
+        time.sleep(delay)
+        number = int(re.search(r'pep-(\d+)/', request.url).group(1))
+        return pep_card_page(number, cards[number])
+
+    cards = {number: status for number, _, _, status in pep_rows(count)}
+    adapter = Adapter()
+    adapter.register_uri('GET', MOCK_PEP_URL, text=pep_index_page(count))
+    adapter.register_uri(
+        'GET', re.compile(re.escape(MOCK_PEP_URL) + r'pep-\d+/'), text=card
+    )
+    return adapter
+
+
+@pytest.fixture
+def pep_session():
+    def _pep_session(count: int, delay: float = 0) -> CachedSession:
+        session = CachedSession(backend='memory')
+        session.mount(MOCK_PEP_URL, get_pep_adapter(count, delay))
+        return session
+    return _pep_session
+
+
+@pytest.fixture
+def pep_server(monkeypatch):
+    from src import main
+    from tests.fixture_data.server import pep_pages, serve
+
+    @contextmanager
+    def _pep_server(count: int, delay: float = 0):
+        pages = pep_pages(count)
+        with serve(pages, delay) as url:
+            monkeypatch.setattr(main, 'PEP_DOC_URL', url)
+            yield url, pages
+    return _pep_server
@@ -0,0 +1,147 @@
+from typing import List, Tuple
+
+PEP_STATUSES = [
+    ('SF', 'Standards Track, Final', 'Final'),
+    ('IA', 'Informational, Active', 'Active'),
+    ('SR', 'Standards Track, Rejected', 'Rejected'),
+    ('PW', 'Process, Withdrawn', 'Withdrawn'),
+    ('SD', 'Standards Track, Deferred', 'Deferred'),
+]
+
+
+def pep_rows(count: int) -> List[Tuple[int, str, str, str]]:
+    return [
+        (number, *PEP_STATUSES[number % len(PEP_STATUSES)])
+        for number in range(1, count + 1)
+    ]
+
+
+def pep_index_page(count: int, categories: int = 0) -> str:
+    """Индекс PEP; categories — разделы «по категориям» перед числовым,
+    как на настоящей странице PEP 0, где каждая строка встречается дважды.
+    """
+    rows = ''.join(
+        '<tr class="row-odd">'
+        f'<td><abbr title="{title}">{abbr}</abbr></td>'
+        f'<td><a class="pep reference internal" href="pep-{number:04d}/" '
+        f'title="PEP {number}">{number}</a></td>'
+        f'<td><a class="pep reference internal" href="pep-{number:04d}/">'
+        f'Title of PEP {number}</a></td>'
+        '<td><span class="author">Guido van Rossum</span></td>'
+        '</tr>'
+        for number, abbr, title, _ in pep_rows(count)
+    )
+    table = (
+        '<table class="pep-zero-table docutils">'
+        '<thead><tr><th>Type</th><th>PEP</th><th>Title</th>'
+        '<th>Authors</th></tr></thead>'
+        f'<tbody>{rows}</tbody></table>'
+    )
+    sections = ''.join(
+        f'<section id="category-{number}"><h3>Category {number}</h3>'
+        f'{table}</section>'
+        for number in range(categories)
+    )
+    return (
+        f'<html><body>{sections}<section id="numerical-index">'
+        f'<h2>Numerical Index</h2>{table}</section></body></html>'
+    )
+
+
+def pep_card_page(number: int, status: str, paragraphs: int = 50) -> str:
+    return (
+        '<html><body><section id="pep-content">'
+        f'<h1 class="page-title">PEP {number} – Title of PEP {number}</h1>'
+        '<dl class="rfc2822 field-list simple">'
+        '<dt class="field-odd">Author<span class="colon">:</span></dt>'
+        '<dd class="field-odd">Guido van Rossum</dd>'
+        '<dt class="field-even">Status<span class="colon">:</span></dt>'
+        f'<dd class="field-even"><abbr title="Accepted and implementation '
+        f'complete">{status}</abbr></dd>'
+        '</dl>'
+        + '<p>Lorem ipsum dolor sit amet, consectetur adipiscing.</p>'
+        * paragraphs
+        + '</section></body></html>'
+    )
+
+
+def whats_new_page(version: str, paragraphs: int = 50) -> str:
+    return (
+        '<html><body><section id="what-s-new-in-python">'
+        f'<h1>What’s New In Python {version}<a class="headerlink" '
+        'href="#what-s-new-in-python" title="Link to this heading">¶</a>'
+        '</h1>'
+        '<dl class="field-list simple">\n'
+        '<dt class="field-odd">Release<span class="colon">:</span></dt>\n'
+        f'<dd class="field-odd"><p>{version}.0</p>\n</dd>\n'
+        '<dt class="field-even">Editor<span class="colon">:</span></dt>\n'
+        '<dd class="field-even"><p>Pablo Galindo Salgado</p>\n</dd>\n'
+        '</dl>'
+        + '<section><h2>Summary</h2><p>New syntax features.</p>'
+        '<dl><dt>term</dt><dd>definition</dd></dl></section>' * paragraphs
+        + '</section></body></html>'
+    )
+
+
+DOCS_ARCHIVES = [
+    'python-3.12-docs-pdf-a4.zip',
+    'python-3.12-docs-pdf-letter.zip',
+    'python-3.12-docs-html.zip',
+    'python-3.12-docs-text.zip',
+    'python-3.12-docs.epub',
+]
+
+
+def download_page(archives: List[str] = DOCS_ARCHIVES) -> str:
+    rows = ''.join(
+        f'<tr><td>Format</td><td><a class="reference external" '
+        f'href="archives/{name}">Download</a></td></tr>'
+        for name in archives
+    )
+    return (
+        '<html><body><section id="download-python-documentation">'
+        '<h1>Download Python documentation</h1>'
+        f'<table class="docutils align-default"><tbody>{rows}</tbody>'
+        '</table></section></body></html>'
+    )
+
+
+PYTHON_VERSIONS = [
+    ('3.13', 'in development'),
+    ('3.12', 'stable'),
+    ('3.11', 'security-fixes'),
+    ('3.10', 'security-fixes'),
+    ('3.9', 'EOL'),
+    ('2.7', 'EOL'),
+]
+
+
+def docs_index_page(versions: List[Tuple[str, str]] = PYTHON_VERSIONS) -> str:
+    links = ''.join(
+        f'<li><a href="https://docs.python.org/{version}/">'
+        f'Python {version} ({status})</a></li>'
+        for version, status in versions
+    )
+    return (
+        '<html><body><div class="sphinxsidebar"><div '
+        'class="sphinxsidebarwrapper"><h3>Docs by version</h3>'
+        f'<ul>{links}<li><a href="https://www.python.org/doc/versions/">'
+        'All versions</a></li></ul></div></div></body></html>'
+    )
+
+
+def whats_new_versions(count: int) -> List[str]:
+    return [f'3.{minor}' for minor in range(count, 0, -1)]
+
+
+def whats_new_index_page(versions: List[str]) -> str:
+    notes = ''.join(
+        f'<li class="toctree-l1"><a class="reference internal" '
+        f'href="{version}.html">What’s New In Python {version}</a></li>'
+        for version in versions
+    )
+    return (
+        '<html><body><section id="what-s-new-in-python">'
+        '<h1>What’s New in Python</h1><div class="toctree-wrapper compound">'
+        f'<ul>{notes}</ul></div></section></body></html>'
+    )
@@ -0,0 +1,145 @@
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List
+
+from tests.fixture_data.pages import (
+    DOCS_ARCHIVES, docs_index_page, download_page, pep_card_page,
+    pep_index_page, pep_rows, whats_new_index_page, whats_new_page,
+    whats_new_versions
+)
+
+
+class PepHandler(BaseHTTPRequestHandler):
+    """Отдаёт индекс PEP и карточки, как peps.python.org."""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    pages: Dict[str, bytes] = {}
+    delay = 0.0
+    sent: Dict[str, int] = {}
+    failures: Dict[str, List[int]] = {}
+    connections: List[str] = []
+
+    def setup(self):
+        super().setup()
+        self.connections.append(self.client_address)
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        body = self.pages.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        if self.failures.get(self.path):
+            self.send_response(self.failures[self.path].pop(0))
+            self.send_header('Retry-After', '0')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        etag = '"{}"'.format(hashlib.md5(body).hexdigest())
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.sent[self.path] = self.sent.get(self.path, 0) + 1
+        offset = self.range_offset(etag)
+        if offset >= len(body) > 0:
+            self.send_response(416)
+            self.send_header('Content-Range', f'bytes */{len(body)}')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(206 if offset else 200)
+        self.send_header('Content-Type', self.content_type())
+        self.send_header('Content-Length', str(len(body) - offset))
+        self.send_header('ETag', etag)
+        if offset:
+            self.send_header(
+                'Content-Range', f'bytes {offset}-{len(body) - 1}/{len(body)}'
+            )
+        self.end_headers()
+        self.wfile.write(body[offset:])
+
+    def do_HEAD(self):
+        body = self.pages.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', self.content_type())
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+
+    def range_offset(self, etag):
+        if self.headers.get('If-Range') not in (None, etag):
+            return 0
+        value = self.headers.get('Range', '')
+        if not value.startswith('bytes=') or not value.endswith('-'):
+            return 0
+        return int(value[len('bytes='):-1])
+
+    def content_type(self):
+        if self.path.endswith('.zip'):
+            return 'application/zip'
+        return 'text/html; charset=utf-8'
+
+    def log_message(self, format, *args):
+        pass
+
+
+def pep_pages(count: int) -> Dict[str, bytes]:
+    pages = {'/': pep_index_page(count).encode()}
+    for number, _, _, status in pep_rows(count):
+        pages[f'/pep-{number:04d}/'] = pep_card_page(number, status).encode()
+    return pages
+
+
+def site_pages(peps: int, versions: int) -> Dict[str, bytes]:
+    """Документация под /docs/3/ и PEP под /peps/ на одном сервере."""
+    pages = {
+        '/docs/3/': docs_index_page().encode(),
+        '/docs/3/whatsnew/': whats_new_index_page(
+            whats_new_versions(versions)
+        ).encode(),
+        '/docs/3/download.html': download_page().encode(),
+    }
+    for version in whats_new_versions(versions):
+        pages[f'/docs/3/whatsnew/{version}.html'] = whats_new_page(
+            version
+        ).encode()
+    for name in DOCS_ARCHIVES:
+        pages[f'/docs/3/archives/{name}'] = name.encode() * 1000
+    for path, body in pep_pages(peps).items():
+        pages['/peps' + path] = body
+    return pages
+
+
+@contextmanager
+def serve(
+    pages: Dict[str, bytes],
+    delay: float = 0,
+    sent: Dict[str, int] = None,
+    failures: Dict[str, List[int]] = None,
+    connections: List[str] = None,
+) -> Iterator[str]:
+    handler = type('Handler', (PepHandler,), {
+        'pages': pages,
+        'delay': delay,
+        'sent': {} if sent is None else sent,
+        'failures': failures or {},
+        'connections': [] if connections is None else connections,
+    })
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_port}/'
+    finally:
+        server.shutdown()
+        server.server_close()
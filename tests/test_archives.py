@@ -0,0 +1,117 @@
+import hashlib
+import os
+import tracemalloc
+from argparse import Namespace
+
+import pytest
+from requests_cache import CachedSession
+
+from src import archives
+from src.configs import configure_session
+from src.constants import HOST_CONNECTIONS
+from src.snapshot import SnapshotWriter
+from tests.fixture_data.server import serve
+
+ARCHIVE = os.urandom(4 * 1024 * 1024)
+ARCHIVE_ETAG = '"{}"'.format(hashlib.md5(ARCHIVE).hexdigest())
+
+
+def test_stream_download_bypasses_cache(tmp_path):
+    session = CachedSession(backend='memory')
+    path = tmp_path / 'docs.zip'
+    with serve({'/docs.zip': ARCHIVE}) as url:
+        checksum = archives.stream_download(session, url + 'docs.zip', path)
+    assert path.read_bytes() == ARCHIVE
+    assert checksum == hashlib.sha256(ARCHIVE).hexdigest()
+    assert checksum in (tmp_path / 'docs.zip.sha256').read_text()
+    assert not (tmp_path / 'docs.zip.part').exists()
+    assert len(list(session.cache.responses.keys())) == 0
+
+
+def test_stream_download_resumes_partial_file(tmp_path):
+    path = tmp_path / 'docs.zip'
+    (tmp_path / 'docs.zip.part').write_bytes(ARCHIVE[:1000])
+    (tmp_path / 'docs.zip.part.validator').write_text(ARCHIVE_ETAG)
+    sent = {}
+    with serve({'/docs.zip': ARCHIVE}, sent=sent) as url:
+        checksum = archives.stream_download(
+            CachedSession(backend='memory'), url + 'docs.zip', path
+        )
+    assert path.read_bytes() == ARCHIVE
+    assert checksum == hashlib.sha256(ARCHIVE).hexdigest()
+    assert sent == {'/docs.zip': 1}
+    assert not (tmp_path / 'docs.zip.part.validator').exists()
+
+
+@pytest.mark.parametrize('part, validator', [
+    (b'x' * 1000, '"stale"'),
+    (b'x' * 1000, None),
+    (b'x' * (len(ARCHIVE) + 2500), ARCHIVE_ETAG),
+], ids=['stale-validator', 'no-validator', 'oversized'])
+def test_stream_download_restarts_foreign_partial_file(
+        tmp_path, part, validator
+):
+    path = tmp_path / 'docs.zip'
+    (tmp_path / 'docs.zip.part').write_bytes(part)
+    if validator:
+        (tmp_path / 'docs.zip.part.validator').write_text(validator)
+    with serve({'/docs.zip': ARCHIVE}) as url:
+        checksum = archives.stream_download(
+            CachedSession(backend='memory'), url + 'docs.zip', path
+        )
+    assert path.read_bytes() == ARCHIVE
+    assert checksum == hashlib.sha256(ARCHIVE).hexdigest()
+
+
+def test_stream_download_restarts_after_range_not_satisfiable(tmp_path):
+    path = tmp_path / 'docs.zip'
+    snapshot_path = tmp_path / 'docs.snapshot'
+    body = os.urandom(1000)
+    with SnapshotWriter(snapshot_path) as writer:
+        writer.add(
+            'https://example.org/docs.zip', 200, {'ETag': '"v1"'}, [body]
+        )
+    (tmp_path / 'docs.zip.part').write_bytes(os.urandom(3500))
+    (tmp_path / 'docs.zip.part.validator').write_text('"v1"')
+    session = configure_session(Namespace(from_snapshot=snapshot_path))
+    checksum = archives.stream_download(
+        session, 'https://example.org/docs.zip', path
+    )
+    assert path.read_bytes() == body
+    assert checksum == hashlib.sha256(body).hexdigest()
+
+
+def test_stream_download_memory_is_flat(tmp_path):
+    with serve({'/docs.zip': ARCHIVE}) as url:
+        tracemalloc.start()
+        archives.stream_download(
+            CachedSession(backend='memory'),
+            url + 'docs.zip',
+            tmp_path / 'docs.zip'
+        )
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    assert peak < len(ARCHIVE) / 8
+
+
+def test_download_archive_host_limit_follows_policy():
+    url = 'https://docs.python.org/3/archives/docs.zip'
+    session = configure_session(Namespace(host_connections=2))
+    assert archives.host_limit(session, url) == 2
+    assert archives.host_limit(
+        CachedSession(backend='memory'), url
+    ) == HOST_CONNECTIONS
+    assert archives.host_semaphore(url, 2) is archives.host_semaphore(url, 2)
+    assert archives.host_semaphore(url, 2) is not archives.host_semaphore(
+        url, 3
+    )
+
+
+def test_is_up_to_date_needs_head(tmp_path):
+    path = tmp_path / 'docs.zip'
+    session = CachedSession(backend='memory')
+    with serve({'/docs.zip': ARCHIVE}) as url:
+        archives.download_archive(session, url + 'docs.zip', path)
+        assert archives.is_up_to_date(session, url + 'docs.zip', path)
+        assert not archives.is_up_to_date(session, url + 'missing.zip', path)
+    assert not archives.is_up_to_date(session, url + 'docs.zip', path)
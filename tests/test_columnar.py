@@ -0,0 +1,78 @@
+import pytest
+
+from src import columnar
+
+RESULTS = [
+    ('Ссылка', 'Версия', 'Доля', 'Статус'),
+    ('https://docs.python.org/3.12/', 312, 0.5, 'stable'),
+    ('https://docs.python.org/2.7/', 27, 1, 'EOL'),
+]
+
+
+@pytest.mark.parametrize('extension', [
+    columnar.COLUMNS_EXTENSION,
+    pytest.param(
+        columnar.PARQUET_EXTENSION,
+        marks=pytest.mark.skipif(
+            not columnar.pyarrow_available(), reason='pyarrow не установлен'
+        )
+    ),
+])
+def test_columnar_round_trip(tmp_path, extension):
+    path = tmp_path / f'results.{extension}'
+    columnar.write_columnar(path, RESULTS)
+    assert columnar.read_columnar(path) == [
+        RESULTS[0],
+        ('https://docs.python.org/3.12/', 312, 0.5, 'stable'),
+        ('https://docs.python.org/2.7/', 27, 1.0, 'EOL'),
+    ]
+
+
+@pytest.mark.parametrize('extension', [
+    columnar.COLUMNS_EXTENSION,
+    pytest.param(
+        columnar.PARQUET_EXTENSION,
+        marks=pytest.mark.skipif(
+            not columnar.pyarrow_available(), reason='pyarrow не установлен'
+        )
+    ),
+])
+def test_columnar_keeps_nulls_and_types(tmp_path, extension):
+    path = tmp_path / f'results.{extension}'
+    columnar.write_columnar(path, [
+        ('Показатель', 'Значение', 'Метка', 'Пусто'),
+        ('Записей', 5, None, None),
+        ('Доля попаданий', None, 'x', None),
+        ('Смешанное', 0.5, 3, None),
+    ])
+    got = columnar.read_columnar(path)
+    assert [type(value) for value in got[1]] == [
+        str, float, type(None), type(None)
+    ]
+    assert got == [
+        ('Показатель', 'Значение', 'Метка', 'Пусто'),
+        ('Записей', 5.0, None, None),
+        ('Доля попаданий', None, 'x', None),
+        ('Смешанное', 0.5, '3', None),
+    ]
+
+
+def test_column_type_ignores_nulls():
+    assert columnar.column_type([1, None, 2]) == columnar.INT
+    assert columnar.column_type([1, None, 0.5]) == columnar.FLOAT
+    assert columnar.column_type([1, 'a']) == columnar.STR
+    assert columnar.column_type([None, None]) == columnar.STR
+
+
+def test_columnar_keeps_header_without_rows(tmp_path):
+    path = tmp_path / 'results.cols'
+    columnar.write_columnar(path, [('Статус', 'Количество')])
+    assert columnar.read_columnar(path) == [('Статус', 'Количество')]
+
+
+def test_columnar_rejects_foreign_file(tmp_path):
+    path = tmp_path / 'results.cols'
+    path.write_text('Статус,Количество', encoding='utf-8')
+    with pytest.raises(BaseException) as excinfo:
+        columnar.read_columnar(path)
+    assert excinfo.typename == 'ColumnarFormatException'
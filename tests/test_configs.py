@@ -1,5 +1,7 @@
-import pytest
 import argparse
+from collections import Counter
+
+import pytest
 try:
     from src import configs
 except ModuleNotFoundError:
@@ -29,7 +31,7 @@ def test_configs_file():
     ),
     (
         argparse._StoreAction, ['-o', '--output'], 'output',
-        ('pretty', 'file'),
+        ('pretty', 'file', 'jsonl', 'columnar'),
         'Дополнительные способы вывода данных'
     ),
 ])
@@ -64,3 +66,77 @@ def test_configure_argument_parser(
     assert got_action.help == help_str, (
         f'Укажите help-строку cli аргумента {got_action.dest}'
     )
+
+
+@pytest.mark.parametrize('modes, accepted', [
+    (['pep', 'whats-new'], True),
+    (['all', 'pep'], True),
+    (['serve'], True),
+    (['serve', 'pep'], False),
+    (['snapshot-build', 'cache-stats', 'all'], False),
+    (['cache-stats', 'cache-stats'], False),
+])
+def test_argument_parser_runs_commands_alone(modes, accepted):
+    parser = configs.configure_argument_parser(
+        ['pep', 'whats-new', 'all', 'serve', 'snapshot-build', 'cache-stats'],
+        ['serve', 'snapshot-build', 'cache-stats'],
+    )
+    if accepted:
+        assert parser.parse_args(modes).mode == modes
+    else:
+        with pytest.raises(SystemExit):
+            parser.parse_args(modes)
+
+
+def test_configure_session_revalidates(monkeypatch):
+    from src import utils
+    from tests.fixture_data.server import pep_pages, serve
+    monkeypatch.setattr(utils, 'cache_stats', Counter())
+    sent = {}
+    cli_args = argparse.Namespace(
+        cache_policy='revalidate', ttl=[('127.0.0.1', 0)]
+    )
+    session = configs.configure_session(cli_args, backend='memory')
+    with serve(pep_pages(1), sent=sent) as url:
+        first = utils.get_response(session, url + 'pep-0001/')
+        second = utils.get_response(session, url + 'pep-0001/')
+    assert first.text == second.text
+    assert second.revalidated
+    assert sent == {'/pep-0001/': 1}
+    assert utils.cache_stats == Counter(miss=1, revalidated=1)
+
+
+def test_configure_session_forever(monkeypatch):
+    from src import utils
+    from tests.fixture_data.server import pep_pages, serve
+    monkeypatch.setattr(utils, 'cache_stats', Counter())
+    session = configs.configure_session(backend='memory')
+    with serve(pep_pages(1)) as url:
+        utils.get_response(session, url)
+        utils.get_response(session, url)
+    assert utils.cache_stats == Counter(miss=1, hit=1)
+
+
+@pytest.mark.parametrize('keep_alive, expected', [(True, 1), (False, 20)])
+def test_configure_session_reuses_connections(keep_alive, expected):
+    from src import utils
+    from tests.fixture_data.server import pep_pages, serve
+    connections = []
+    session = configs.configure_session(
+        argparse.Namespace(no_keep_alive=not keep_alive), backend='memory'
+    )
+    with serve(pep_pages(20), connections=connections) as url:
+        for number in range(1, 21):
+            utils.get_response(session, f'{url}pep-{number:04d}/')
+    assert len(connections) == expected
+
+
+def test_configure_session_pool_and_encoding():
+    session = configs.configure_session(
+        argparse.Namespace(pool_size=32, host_connections=8),
+        backend='memory'
+    )
+    adapter = session.get_adapter('https://peps.python.org/')
+    assert adapter._pool_maxsize == 32
+    assert adapter.policy.host_connections == 8
+    assert 'gzip' in session.headers['Accept-Encoding']
@@ -0,0 +1,116 @@
+from argparse import Namespace
+
+import pytest
+from requests_cache import CachedSession
+
+from src import main
+from src.crawler import crawl, url_scope
+from src.extractors import page_links
+from tests.fixture_data.pages import (whats_new_index_page, whats_new_page,
+                                      whats_new_versions)
+from tests.fixture_data.server import serve
+
+
+def link_page(*hrefs):
+    return ''.join(f'<a href="{href}">{href}</a>' for href in hrefs).encode()
+
+
+def visit_links(response, depth, follow):
+    links = page_links(response.content, response.encoding) if follow else []
+    return depth, links
+
+
+@pytest.fixture
+def link_graph():
+    return {
+        '/docs/': link_page('a.html'),
+        '/docs/a.html': link_page('b.html', './c.html#top', '/other/'),
+        '/docs/b.html': link_page('a.html', 'C.html', 'https://example.com/'),
+        '/docs/c.html': link_page('d.html'),
+        '/docs/d.html': link_page(),
+        '/other/': link_page(),
+    }
+
+
+def test_url_scope():
+    assert url_scope('HTTPS://Docs.python.org:443/3/whatsnew/') == (
+        'https://docs.python.org/3/whatsnew/'
+    )
+    assert url_scope('https://docs.python.org/3/whatsnew/3.12.html') == (
+        'https://docs.python.org/3/whatsnew/'
+    )
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_crawl_visits_each_page_once(link_graph, workers):
+    sent = {}
+    with serve(link_graph, sent=sent) as url:
+        pages = list(crawl(
+            CachedSession(backend='memory'), url + 'docs/', visit_links,
+            max_depth=5, cli_args=Namespace(workers=workers),
+        ))
+    assert [(page.url[len(url):], page.depth) for page in pages] == [
+        ('docs/', 0), ('docs/a.html', 1), ('docs/b.html', 2),
+        ('docs/c.html', 2), ('docs/C.html', 3), ('docs/d.html', 3),
+    ]
+    assert sent == dict.fromkeys(
+        ['/docs/', '/docs/a.html', '/docs/b.html', '/docs/c.html',
+         '/docs/d.html'], 1
+    )
+    assert [page.error is not None for page in pages] == [
+        False, False, False, False, True, False
+    ]
+
+
+def test_crawl_stops_at_depth(link_graph):
+    sent = {}
+    with serve(link_graph, sent=sent) as url:
+        pages = list(crawl(
+            CachedSession(backend='memory'), url + 'docs/', visit_links,
+            max_depth=1,
+        ))
+    assert [page.depth for page in pages] == [0, 1]
+    assert set(sent) == {'/docs/', '/docs/a.html'}
+
+
+def test_crawl_scopes(link_graph):
+    with serve(link_graph) as url:
+        pages = list(crawl(
+            CachedSession(backend='memory'), url + 'docs/', visit_links,
+            max_depth=2, scopes=[url + 'docs/a', url + 'other/'],
+        ))
+    assert [page.url[len(url):] for page in pages] == [
+        'docs/', 'docs/a.html', 'other/'
+    ]
+
+
+def test_whats_new_depth(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    versions = whats_new_versions(3)
+    pages = {
+        '/whatsnew/': whats_new_index_page(versions).encode(),
+        '/whatsnew/changelog.html': link_page('3.0.html'),
+        '/whatsnew/3.0.html': whats_new_page('3.0', paragraphs=1).encode(),
+    }
+    for version in versions:
+        pages[f'/whatsnew/{version}.html'] = (
+            whats_new_page(version, paragraphs=1).encode()
+            + link_page('changelog.html', '../index.html')
+        )
+    sent = {}
+    with serve(pages, sent=sent) as url:
+        monkeypatch.setattr(main, 'MAIN_DOC_URL', url)
+        shallow = main.whats_new(
+            CachedSession(backend='memory'), Namespace(depth=None)
+        )
+        deep = main.whats_new(
+            CachedSession(backend='memory'), Namespace(depth=3)
+        )
+    assert [row[0] for row in shallow[1:]] == [
+        f'{url}whatsnew/{version}.html' for version in versions
+    ]
+    assert deep[:len(shallow)] == shallow
+    assert [row[0] for row in deep[len(shallow):]] == [
+        f'{url}whatsnew/3.0.html'
+    ]
+    assert sent['/whatsnew/changelog.html'] == 1
@@ -0,0 +1,128 @@
+import os
+import threading
+import time
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from requests_cache import CachedSession
+
+from src import engines, main
+from src.extractors import pep_card_status
+
+
+@pytest.mark.parametrize('workers', [1, 8])
+def test_sync_map_keeps_order(workers):
+    got = list(engines.sync_map(lambda x: x * 2, range(50), workers))
+    assert got == [x * 2 for x in range(50)]
+
+
+def test_sync_map_streams_results():
+    release = threading.Event()
+
+    def wait_last(item):
+        if item == 9:
+            assert release.wait(5)
+        return item
+
+    results = engines.sync_map(wait_last, range(10), 4)
+    assert next(results) == 0
+    release.set()
+    assert list(results) == list(range(1, 10))
+
+
+def test_run_engine_ignores_parse_procs():
+    got = list(engines.run_engine(
+        lambda item: threading.get_ident(), range(4),
+        Namespace(parse_procs=4)
+    ))
+    assert set(got) == {threading.get_ident()}
+
+
+def test_run_engine_defaults():
+    got = list(engines.run_engine(str, [1, 2, 3]))
+    assert got == ['1', '2', '3']
+
+
+def test_pep_workers_match_serial(pep_server):
+    with pep_server(30):
+        serial = main.pep(CachedSession(backend='memory'), Namespace())
+        got = main.pep(
+            CachedSession(backend='memory'), Namespace(workers=10)
+        )
+    assert got == serial
+    assert got[-1] == ('Всего', 30)
+
+
+def test_workers_fetch_concurrently(pep_server):
+    with pep_server(40, delay=0.05):
+        start = time.perf_counter()
+        main.pep(CachedSession(backend='memory'), Namespace(workers=10))
+        elapsed = time.perf_counter() - start
+    assert elapsed < 40 * 0.05 / 4
+
+
+def test_run_parser_uses_other_process():
+    pool = engines.open_parse_pool(2)
+    try:
+        assert engines.run_parser(pool, os.getpid) != os.getpid()
+    finally:
+        pool.shutdown()
+    assert engines.open_parse_pool(None) is None
+    assert engines.run_parser(None, os.getpid) == os.getpid()
+
+
+def test_pep_parse_pool_matches_threads(pep_server):
+    with pep_server(30):
+        expected = main.pep(CachedSession(backend='memory'), Namespace())
+        session = CachedSession(backend='memory')
+        session.parse_pool = engines.open_parse_pool(2)
+        try:
+            got = main.pep(session, Namespace(parse_procs=2))
+        finally:
+            session.parse_pool.shutdown()
+    assert got == expected
+
+
+def test_parses_overlap_with_one_io_worker(monkeypatch, pep_session):
+    # Потоки вместо процессов: барьер пропустит только два разбора сразу.
+    both_parsing = threading.Barrier(2, timeout=5)
+
+    def paired_parse(content, encoding='utf-8'):
+        both_parsing.wait()
+        return pep_card_status(content, encoding)
+
+    session = pep_session(4)
+    expected = main.pep(session)
+    monkeypatch.setattr(main, 'pep_card_status', paired_parse)
+    session.parse_pool = ThreadPoolExecutor(max_workers=2)
+    try:
+        got = main.pep(session, Namespace(workers=1, parse_procs=2))
+    finally:
+        session.parse_pool.shutdown()
+    assert got == expected
+
+
+def test_main_shuts_parse_pool_down_on_error(monkeypatch, tmp_path):
+    pools = []
+
+    class Pool:
+        def __init__(self, procs):
+            self.closed = False
+            pools.append(self)
+
+        def shutdown(self):
+            self.closed = True
+
+    def broken_modes(session, cli_args):
+        raise RuntimeError('boom')
+
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    monkeypatch.setattr(main, 'open_parse_pool', Pool)
+    monkeypatch.setattr(main, 'run_modes', broken_modes)
+    monkeypatch.setattr(main, 'configure_logging', lambda: None)
+    monkeypatch.setattr('sys.argv', [
+        'main.py', 'pep', '--parse-procs', '2', '--cache-backend', 'memory'
+    ])
+    main.main()
+    assert [pool.closed for pool in pools] == [True]
@@ -0,0 +1,59 @@
+import pytest
+from bs4 import BeautifulSoup
+
+from src import extractors
+from tests.fixture_data.pages import (
+    pep_card_page, pep_index_page, pep_rows, whats_new_page
+)
+
+
+def test_whats_new_record_matches_soup():
+    page = whats_new_page('3.10')
+    soup = BeautifulSoup(page, 'lxml')
+    expected = (
+        soup.find('h1').text,
+        soup.find('dl').text.replace('\n', ' '),
+    )
+    assert extractors.whats_new_record(page.encode()) == expected
+
+
+def test_pep_card_status():
+    page = pep_card_page(8, 'Active').encode()
+    assert extractors.pep_card_status(page) == 'Active'
+
+
+def test_extract_first_matches_class():
+    element, = extractors.extract_first(
+        pep_card_page(8, 'Active').encode(),
+        ('dl', {'class': 'field-list'}),
+    )
+    assert element.get('class') == 'rfc2822 field-list simple'
+
+
+def test_extract_first_exception():
+    with pytest.raises(BaseException) as excinfo:
+        extractors.extract_first(b'<p>text</p>', ('unexpected', None))
+    assert excinfo.typename == 'ParserFindTagException'
+    assert 'Не найден тег unexpected None' in str(excinfo.value)
+
+
+def test_pep_index_records_single_pass():
+    records = extractors.pep_index_records(
+        pep_index_page(12, categories=2).encode()
+    )
+    assert records == [
+        extractors.PepIndexRecord(
+            number=str(number),
+            type=abbr[0],
+            status_abbr=abbr[1:],
+            href=f'pep-{number:04d}/',
+            title=f'Title of PEP {number}',
+        )
+        for number, abbr, _, _ in pep_rows(12)
+    ]
+
+
+def test_pep_index_records_without_section():
+    with pytest.raises(BaseException) as excinfo:
+        extractors.pep_index_records(b'<table><tr><td>1</td></tr></table>')
+    assert excinfo.typename == 'ParserFindTagException'
@@ -0,0 +1,68 @@
+import time
+from argparse import Namespace
+
+import pytest
+import requests
+
+from src import configs, fetch_policy, utils
+from tests.fixture_data.server import serve
+
+PAGES = {'/page/': b'<html><h1>page</h1></html>'}
+
+
+def policy_session(**options):
+    cli_args = Namespace(backoff=0, **options)
+    return configs.configure_session(cli_args, backend='memory')
+
+
+def test_retries_on_server_errors():
+    sent = {}
+    failures = {'/page/': [503, 429, 502]}
+    session = policy_session(retries=3)
+    with serve(PAGES, sent=sent, failures=failures) as url:
+        response = utils.get_response(session, url + 'page/')
+    assert response.status_code == 200
+    assert response.text == PAGES['/page/'].decode()
+    assert failures['/page/'] == []
+
+
+def test_gives_up_after_retries():
+    failures = {'/page/': [503, 503, 503]}
+    session = policy_session(retries=1)
+    with serve(PAGES, failures=failures) as url:
+        with pytest.raises(ConnectionError):
+            utils.get_response(session, url + 'page/')
+    assert failures['/page/'] == [503]
+
+
+def test_get_response_raises_connection_error():
+    session = policy_session(retries=0, timeout=1)
+    with pytest.raises(ConnectionError):
+        utils.get_response(session, 'http://127.0.0.1:9/')
+
+
+@pytest.mark.parametrize('headers, expected', [
+    ({'Retry-After': '7'}, 7),
+    ({'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'}, 0),
+    ({'Retry-After': 'Wed, 21 Oct 2015 07:28:00 -0000'}, 0),
+    ({'Retry-After': 'soon'}, None),
+    ({}, None),
+])
+def test_retry_after(headers, expected):
+    response = requests.Response()
+    response.headers.update(headers)
+    assert fetch_policy.retry_after(response) == expected
+
+
+def test_token_bucket_limits_rate():
+    bucket = fetch_policy.TokenBucket(rate=50, capacity=1)
+    start = time.perf_counter()
+    for _ in range(11):
+        bucket.acquire()
+    assert time.perf_counter() - start >= 10 / 50 * 0.9
+
+
+def test_backoff_delay_is_bounded():
+    policy = fetch_policy.FetchPolicy(backoff=1)
+    for attempt in range(20):
+        assert 0 <= policy.backoff_delay(attempt) <= fetch_policy.MAX_BACKOFF
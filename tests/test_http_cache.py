@@ -0,0 +1,93 @@
+from argparse import Namespace
+from collections import Counter
+
+import pytest
+
+from src import configs, main, utils
+from tests.fixture_data.server import pep_pages, serve
+
+
+def cache_session(tmp_path, backend, **options):
+    return configs.configure_session(
+        Namespace(cache_backend=backend, cache_dir=tmp_path, **options)
+    )
+
+
+@pytest.mark.parametrize('backend', ['sqlite', 'filesystem', 'dbm'])
+def test_cache_backends_persist_responses(monkeypatch, tmp_path, backend):
+    monkeypatch.setattr(utils, 'cache_stats', Counter())
+    sent = {}
+    with serve(pep_pages(1), sent=sent) as url:
+        first = utils.get_response(
+            cache_session(tmp_path, backend), url + 'pep-0001/'
+        )
+        second = utils.get_response(
+            cache_session(tmp_path, backend), url + 'pep-0001/'
+        )
+    assert second.from_cache
+    assert first.text == second.text
+    assert sent == {'/pep-0001/': 1}
+    assert utils.cache_stats == Counter(miss=1, hit=1)
+
+
+def test_memory_backend_keeps_nothing_on_disk(tmp_path):
+    session = cache_session(tmp_path, 'memory')
+    with serve(pep_pages(1)) as url:
+        utils.get_response(session, url)
+    session.cache.limiter.save(Counter(miss=1))
+    assert session.cache.limiter.stats()['entries'] == 1
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize('backend', ['sqlite', 'filesystem', 'dbm'])
+def test_cache_compresses_bodies(tmp_path, backend):
+    stored = {}
+    for compression in ('none', 'gzip'):
+        session = cache_session(
+            tmp_path / compression, backend, cache_compression=compression
+        )
+        with serve(pep_pages(1)) as url:
+            response = utils.get_response(session, url + 'pep-0001/')
+        stored[compression] = session.cache.limiter.stats()['bytes']
+    assert stored['none'] > len(response.content)
+    assert stored['gzip'] < stored['none'] / 3
+
+
+@pytest.mark.parametrize('backend', ['sqlite', 'filesystem', 'dbm', 'memory'])
+def test_cache_trim_evicts_least_recently_used(tmp_path, backend):
+    session = cache_session(tmp_path, backend, cache_max_size=0)
+    limiter = session.cache.limiter
+    with serve(pep_pages(3)) as url:
+        for number in (1, 2, 3, 1):
+            utils.get_response(session, f'{url}pep-{number:04d}/')
+        sizes = limiter.sizes()
+        limiter.max_size = sum(sizes.values()) - 1
+        assert limiter.trim() == 1
+        assert session.cache.limiter.stats()['entries'] == 2
+        assert utils.get_response(session, url + 'pep-0001/').from_cache
+        assert utils.get_response(session, url + 'pep-0003/').from_cache
+        assert not utils.get_response(session, url + 'pep-0002/').from_cache
+
+
+def test_cache_stats_command(tmp_path):
+    session = cache_session(tmp_path, 'sqlite')
+    with serve(pep_pages(1)) as url:
+        utils.get_response(session, url)
+        utils.get_response(session, url)
+    session.cache.limiter.save(Counter(miss=1, hit=3))
+    rows = dict(main.cache_stats_rows(cache_session(tmp_path, 'sqlite')))
+    assert rows['Записей'] == 1
+    assert rows['Байт'] > 0
+    assert rows['Попаданий'] == 3
+    assert rows['Доля попаданий'] == 0.75
+
+
+def test_clear_resets_cache_and_stats(tmp_path):
+    session = cache_session(tmp_path, 'dbm')
+    with serve(pep_pages(1)) as url:
+        utils.get_response(session, url)
+    session.cache.limiter.save(Counter(miss=1))
+    session.cache.limiter.clear()
+    assert session.cache.limiter.stats() == {
+        'entries': 0, 'bytes': 0, 'cache': {}, 'cache_hit_ratio': None,
+    }
@@ -1,7 +1,23 @@
+import gc
+import json
+import time
+import tracemalloc
+from argparse import Namespace
+
 import pytest
 from pathlib import Path
+import requests
+from requests_cache import CachedSession
 try:
     from src import main
+    from src.configs import mount_snapshot
+    from src.extractors import pep_card_status
+    from src.snapshot import SnapshotWriter
+    from tests.fixture_data.pages import (
+        DOCS_ARCHIVES, download_page, whats_new_index_page, whats_new_page,
+        whats_new_versions
+    )
+    from tests.fixture_data.server import serve, site_pages
 except ModuleNotFoundError:
     assert False, 'Убедитесь что в директории `src` есть файл `main.py`'
 except ImportError:
@@ -140,3 +156,184 @@ def test_mode_to_function():
             'В модуле `main.py` в объекте `MODE_TO_FUNCTION` '
             f'нет значения {func}'
         )
+
+
+def test_pep_workers_match_sequential(pep_session):
+    sequential = main.pep(pep_session(20), Namespace(workers=1))
+    concurrent = main.pep(pep_session(20), Namespace(workers=8))
+    assert concurrent == sequential, (
+        'Результаты функции `pep` не должны зависеть от количества потоков'
+    )
+    assert sequential[-1] == ('Всего', 20)
+
+
+def test_pep_workers_speedup(pep_session):
+    start = time.perf_counter()
+    main.pep(pep_session(20, delay=0.05), Namespace(workers=1))
+    sequential = time.perf_counter() - start
+    start = time.perf_counter()
+    main.pep(pep_session(20, delay=0.05), Namespace(workers=10))
+    concurrent = time.perf_counter() - start
+    assert concurrent < sequential / 3, (
+        'Параллельная загрузка карточек PEP должна быть быстрее '
+        'последовательной'
+    )
+
+
+def test_pep_incremental_reparses_changed_cards(
+        monkeypatch, tmp_path, pep_server
+):
+    from tests.fixture_data.pages import pep_card_page
+    parsed = []
+
+    def counting_parse(content, encoding='utf-8'):
+        parsed.append(content)
+        return pep_card_status(content, encoding)
+
+    monkeypatch.setattr(main, 'BASE_DIR', Path(tmp_path))
+    monkeypatch.setattr(main, 'pep_card_status', counting_parse)
+    cli_args = Namespace(incremental=True)
+    session = CachedSession(backend='memory', expire_after=0)
+    with pep_server(10) as (_, pages):
+        first = main.pep(session, cli_args)
+        assert len(parsed) == 10
+        parsed.clear()
+        assert main.pep(session, cli_args) == first
+        assert parsed == []
+        pages['/pep-0003/'] = pep_card_page(3, 'Rejected').encode()
+        got = main.pep(session, cli_args)
+    assert parsed == [pages['/pep-0003/']]
+    assert got != first
+    assert (tmp_path / 'states' / 'pep.json').exists()
+
+
+def test_pep_incremental_skips_stale_entries(
+        monkeypatch, tmp_path, pep_server
+):
+    from tests.fixture_data.pages import pep_index_page
+    monkeypatch.setattr(main, 'BASE_DIR', Path(tmp_path))
+    cli_args = Namespace(incremental=True)
+    session = CachedSession(backend='memory', expire_after=0)
+    with pep_server(10) as (_, pages):
+        main.pep(session, cli_args)
+        del pages['/pep-0003/']
+        pages['/'] = pep_index_page(8).encode()
+        got = main.pep(session, cli_args)
+    assert got[-1] == ('Всего', 7)
+    state = json.loads((tmp_path / 'states' / 'pep.json').read_text())
+    assert sorted(map(int, state)) == list(range(1, 9))
+
+
+@pytest.mark.parametrize('cli_args, expected', [
+    (Namespace(), ['python-3.12-docs-pdf-a4.zip']),
+    (
+        Namespace(formats=['html', 'epub']),
+        ['python-3.12-docs-html.zip', 'python-3.12-docs.epub']
+    ),
+    (Namespace(all=True), DOCS_ARCHIVES),
+])
+def test_download_formats(monkeypatch, tmp_path, cli_args, expected):
+    pages = {'/download.html': download_page().encode()}
+    for name in DOCS_ARCHIVES:
+        pages[f'/archives/{name}'] = name.encode() * 1000
+    monkeypatch.setattr(main, 'BASE_DIR', Path(tmp_path))
+    sent = {}
+    with serve(pages, sent=sent) as url:
+        monkeypatch.setattr(main, 'MAIN_DOC_URL', url)
+        main.download(CachedSession(backend='memory'), cli_args)
+        main.download(CachedSession(backend='memory'), cli_args)
+    got = sorted(path.name for path in (tmp_path / 'downloads').glob('*'))
+    assert got == sorted(
+        [*expected, *(name + '.sha256' for name in expected)]
+    )
+    for name in expected:
+        assert sent[f'/archives/{name}'] == 1
+
+
+def test_expand_modes():
+    assert main.expand_modes(['pep', 'all', 'pep']) == [
+        'pep', 'whats-new', 'latest-versions', 'download'
+    ]
+
+
+def test_run_modes_share_session(monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    modes = ['pep', 'latest-versions', 'whats-new', 'pep']
+    sent = {}
+    with serve(site_pages(peps=20, versions=5), sent=sent) as url:
+        monkeypatch.setattr(main, 'MAIN_DOC_URL', url + 'docs/3/')
+        monkeypatch.setattr(main, 'PEP_DOC_URL', url + 'peps/')
+        expected = [
+            main.MODE_TO_FUNCTION[mode](
+                CachedSession(backend='memory'), Namespace(workers=4)
+            )
+            for mode in modes[:3]
+        ]
+        sent.clear()
+        main.run_modes(
+            CachedSession(backend='memory'),
+            Namespace(mode=modes, output=None, workers=4)
+        )
+    assert set(sent.values()) == {1}
+    assert capsys.readouterr().out.splitlines() == [
+        ' '.join(map(str, row)) for rows in expected for row in rows
+    ]
+
+
+def test_run_modes_outputs_modes_that_succeeded(
+        monkeypatch, tmp_path, capsys, caplog
+):
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+
+    def broken_rows(session, cli_args=None):
+        raise ConnectionError('нет связи')
+
+    monkeypatch.setitem(main.MODE_TO_ROWS, 'latest-versions', broken_rows)
+    with serve(site_pages(peps=5, versions=2)) as url:
+        monkeypatch.setattr(main, 'PEP_DOC_URL', url + 'peps/')
+        expected = main.pep(CachedSession(backend='memory'))
+        main.run_modes(
+            CachedSession(backend='memory'),
+            Namespace(mode=['latest-versions', 'pep'], output=None)
+        )
+    assert capsys.readouterr().out.splitlines() == [
+        ' '.join(map(str, row)) for row in expected
+    ]
+    assert 'Ошибка режима latest-versions: нет связи' in caplog.text
+
+
+def whats_new_crawl_peak(monkeypatch, tmp_path, count):
+    url = 'https://docs.example.org/3/'
+    versions = whats_new_versions(count)
+    path = tmp_path / f'whats-new-{count}.snapshot'
+    with SnapshotWriter(path) as writer:
+        writer.add(url + 'whatsnew/', 200, {}, [
+            whats_new_index_page(versions).encode()
+        ])
+        for version in versions:
+            writer.add(url + f'whatsnew/{version}.html', 200, {}, [
+                whats_new_page(version, paragraphs=200).encode()
+            ])
+    monkeypatch.setattr(main, 'MAIN_DOC_URL', url)
+    rows = main.whats_new_rows(
+        mount_snapshot(requests.Session(), path), Namespace()
+    )
+    tracemalloc.start()
+    try:
+        next(rows)
+        gc.collect()
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        assert sum(1 for _ in rows) == count
+        return tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+
+def test_whats_new_memory_is_flat(monkeypatch, tmp_path):
+    whats_new_crawl_peak(monkeypatch, tmp_path, 10)
+    small = whats_new_crawl_peak(monkeypatch, tmp_path, 100)
+    large = whats_new_crawl_peak(monkeypatch, tmp_path, 400)
+    page_size = len(whats_new_page('3.1', paragraphs=200).encode())
+    assert large < small * 1.25 + 64 * 1024
+    assert large < page_size * 20
@@ -1,3 +1,4 @@
+import json
 from datetime import datetime
 from typing import Optional
 from pathlib import Path
@@ -90,3 +91,48 @@ def test_output_file():
     assert hasattr(outputs, 'file_output'), (
         'Напишите функцию `file_output` в модуле `output.py`'
     )
+
+
+def test_file_output_writes_rows_incrementally(monkeypatch, tmp_path):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    written = []
+
+    def rows():
+        yield ('Статус', 'Количество')
+        yield ('Active', 1)
+        written.append(
+            next((tmp_path / 'results').glob('*.csv')).read_text('utf-8')
+        )
+        yield ('Всего', 1)
+
+    outputs.control_output(rows(), cli_args('pep', 'file'))
+    assert written == ['Статус,Количество\nActive,1\n']
+
+
+def test_pretty_output_buffers_generator(capsys):
+    rows = iter([('Статус', 'Количество'), ('Active', 1)])
+    outputs.control_output(rows, cli_args('pep', 'pretty'))
+    captured_out, _ = capsys.readouterr()
+    assert 'Active' in captured_out
+
+
+def test_jsonl_output(monkeypatch, tmp_path):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    rows = [('Статус', 'Количество'), ('Active', 36), ('Всего', 36)]
+    outputs.control_output(iter(rows), cli_args('pep', 'jsonl'))
+    file_path, = (tmp_path / 'results').glob('pep_*.jsonl')
+    assert [
+        json.loads(line) for line in file_path.read_text('utf-8').splitlines()
+    ] == [
+        {'Статус': 'Active', 'Количество': 36},
+        {'Статус': 'Всего', 'Количество': 36},
+    ]
+
+
+def test_columnar_output(monkeypatch, tmp_path):
+    from src.columnar import read_columnar
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    rows = [('Статус', 'Количество'), ('Active', 36), ('Всего', 36)]
+    outputs.control_output(iter(rows), cli_args('pep', 'columnar'))
+    file_path, = (tmp_path / 'results').glob('pep_*')
+    assert read_columnar(file_path) == rows
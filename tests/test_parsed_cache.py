@@ -0,0 +1,89 @@
+import threading
+import time
+from argparse import Namespace
+from pathlib import Path
+
+from src import main
+from src.extractors import pep_card_status, pep_index_records
+from src.parsed_cache import ParsedCache
+
+
+def test_parsed_cache_round_trip(tmp_path):
+    cache = ParsedCache(tmp_path / 'parsed.sqlite', 10)
+    cache.set('status', 'Final')
+    cache.set('record', ('h1', 'dl'))
+    assert cache.get('status') == 'Final'
+    assert cache.get('record') == ('h1', 'dl')
+    assert cache.get('missing') is None
+
+
+def test_parsed_cache_evicts_least_recently_used(tmp_path):
+    cache = ParsedCache(tmp_path / 'parsed.sqlite', 3)
+    for key in 'abc':
+        cache.set(key, key)
+    cache.get('a')
+    cache.set('d', 'd')
+    assert len(cache) == 3
+    assert cache.get('b') is None
+    assert cache.get('a') == 'a'
+
+
+def test_pep_skips_parsing_cached_cards(monkeypatch, tmp_path, pep_session):
+    parsed = []
+
+    def counting_parse(content, encoding='utf-8'):
+        parsed.append(content)
+        return pep_card_status(content, encoding)
+
+    monkeypatch.setattr(main, 'BASE_DIR', Path(tmp_path))
+    monkeypatch.setattr(main, 'pep_card_status', counting_parse)
+    cli_args = Namespace(parsed_cache_size=100)
+    session = pep_session(5)
+    first = main.pep(session, cli_args)
+    assert len(parsed) == 5
+    parsed.clear()
+    assert main.pep(session, cli_args) == first
+    assert parsed == []
+    ParsedCache(tmp_path / 'cache' / 'parsed.sqlite', 0).clear()
+    main.pep(session, cli_args)
+    assert len(parsed) == 5
+
+
+def test_parsed_cache_follows_cache_dir(monkeypatch, tmp_path, pep_session):
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path / 'base')
+    cli_args = Namespace(parsed_cache_size=100, cache_dir=tmp_path / 'other')
+    main.pep(pep_session(2), cli_args)
+    assert (tmp_path / 'other' / 'parsed.sqlite').exists()
+    assert not (tmp_path / 'base').exists()
+
+
+def test_concurrent_peps_parse_each_page_once(monkeypatch, pep_session):
+    monkeypatch.setitem(main.coalesced_stats, 'fetch_and_extract', 0)
+    parsed = []
+
+    def counting(extractor):
+        def parse(content, encoding='utf-8'):
+            parsed.append(extractor)
+            # Ждём, пока второй вызов pep дойдёт до этой же страницы.
+            deadline = time.monotonic() + 0.5
+            while (main.coalesced_stats['fetch_and_extract'] < len(parsed)
+                   and time.monotonic() < deadline):
+                time.sleep(0.001)
+            return extractor(content, encoding)
+        return parse
+
+    monkeypatch.setattr(main, 'pep_index_records', counting(pep_index_records))
+    monkeypatch.setattr(main, 'pep_card_status', counting(pep_card_status))
+    session = pep_session(20)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(main.pep(session)))
+        for _ in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+    assert len(results) == 2 and results[0] == results[1]
+    assert parsed.count(pep_card_status) == 20
+    assert parsed.count(pep_index_records) == 1
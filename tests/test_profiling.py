@@ -0,0 +1,84 @@
+import gzip
+import io
+import time
+from argparse import Namespace
+
+import pytest
+import requests
+from requests_cache import CachedSession
+from urllib3 import HTTPResponse
+
+from src import engines, main, outputs, profiling, utils
+
+
+@pytest.fixture
+def profiler(monkeypatch):
+    profiler = main.profiler
+    profiler.reset()
+    monkeypatch.setattr(profiler, 'enabled', True)
+    yield profiler
+    profiler.reset()
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert profiling.percentile(values, 50) == 50
+    assert profiling.percentile(values, 99) == 99
+    assert profiling.percentile([7], 95) == 7
+
+
+def test_profiler_records_phases(profiler, pep_session):
+    main.pep(pep_session(5))
+    report = profiler.report({'miss': 6})
+    phases = report['phases']
+    assert phases['get_response']['count'] == 6
+    assert phases['extract_first']['count'] == 5
+    assert phases['pep_index_records']['count'] == 1
+    assert report['bytes'] > 0
+    assert report['cache_hit_ratio'] == 0
+    assert 'get_response' in profiling.profile_table(report).get_string()
+
+
+def test_wire_size_counts_compressed_bytes():
+    body = b'<p>PEP</p>' * 1000
+    compressed = gzip.compress(body)
+    response = requests.Response()
+    response.headers['Content-Encoding'] = 'gzip'
+    response.raw = HTTPResponse(
+        body=io.BytesIO(compressed), headers=response.headers,
+        preload_content=False,
+    )
+    assert response.content == body
+    assert utils.wire_size(response) == len(compressed)
+
+
+def test_profiler_keeps_phases_from_parse_pool(profiler, pep_server):
+    session = CachedSession(backend='memory')
+    session.parse_pool = engines.open_parse_pool(1)
+    try:
+        with pep_server(5):
+            main.pep(session)
+    finally:
+        session.parse_pool.shutdown()
+    phases = profiler.report()['phases']
+    assert phases['extract_first']['count'] == 5
+    assert phases['pep_index_records']['count'] == 1
+    assert phases['parse_pool']['count'] == 6
+
+
+def test_profiler_excludes_row_production_from_writer(profiler, capsys):
+    def rows():
+        yield ('Статус', 'Количество')
+        time.sleep(0.05)
+        yield ('Active', 1)
+
+    outputs.control_output(rows(), Namespace(mode='pep', output=None))
+    writer, = main.profiler.report()['phases'].values()
+    assert writer['count'] == 1
+    assert writer['total'] < 0.05
+
+
+def test_profiler_disabled_records_nothing(pep_session):
+    main.profiler.reset()
+    main.pep(pep_session(2))
+    assert main.profiler.report()['phases'] == {}
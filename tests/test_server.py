@@ -0,0 +1,88 @@
+import threading
+from argparse import Namespace
+from contextlib import contextmanager
+
+import pytest
+from requests_cache import CachedSession
+
+from src import main
+from src.configs import configure_argument_parser
+from src.server import create_server, ignored_args, query_server
+from tests.fixture_data.server import pep_pages, serve
+
+
+@contextmanager
+def parser_server(session):
+    server = create_server(
+        session, {**main.MODE_TO_ROWS, **main.COMMAND_TO_ROWS}, port=0
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_port}/'
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_server_reuses_warm_session(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    sent = {}
+    cli_args = Namespace(mode='pep', output=None, parsed_cache_size=100)
+    with serve(pep_pages(10), sent=sent) as url:
+        monkeypatch.setattr(main, 'PEP_DOC_URL', url)
+        expected = main.pep(CachedSession(backend='memory'), cli_args)
+        sent.clear()
+        with parser_server(CachedSession(backend='memory')) as server_url:
+            first = query_server(server_url, cli_args)
+            second = query_server(server_url, cli_args)
+    assert first == second == expected
+    assert sum(sent.values()) == 11
+
+
+def test_client_sends_only_mode_args():
+    server = create_server(CachedSession(backend='memory'), {
+        'echo': lambda session, cli_args: sorted(vars(cli_args).items())
+    }, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        got = query_server(
+            f'http://127.0.0.1:{server.server_port}/',
+            Namespace(
+                mode='echo', workers=4, clear_cache=True, cache_dir='/tmp',
+                from_snapshot='docs.snapshot', output='pretty'
+            )
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert got == [('mode', 'echo'), ('workers', 4)]
+
+
+def test_ignored_args_lists_session_settings():
+    arg_parser = configure_argument_parser(['pep'])
+    cli_args = arg_parser.parse_args([
+        'pep', '-c', '--server', 'http://127.0.0.1:8765', '-w', '4',
+        '--cache-backend', 'memory', '-o', 'pretty',
+    ])
+    assert ignored_args(cli_args, arg_parser) == [
+        'clear_cache', 'cache_backend'
+    ]
+
+
+def test_server_reports_unknown_mode():
+    with parser_server(CachedSession(backend='memory')) as server_url:
+        with pytest.raises(ConnectionError, match='404'):
+            query_server(server_url, Namespace(mode='serve'))
+
+
+def test_client_keeps_output_flags(monkeypatch, capsys, pep_server):
+    with pep_server(3) as (url, _):
+        with parser_server(CachedSession(backend='memory')) as server_url:
+            main.run_remote(Namespace(
+                mode='pep', output='pretty', server=server_url,
+                parsed_cache_size=0
+            ))
+    output = capsys.readouterr().out
+    assert '| Статус' in output
+    assert '| Всего     | 3 ' in output
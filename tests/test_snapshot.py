@@ -0,0 +1,83 @@
+from argparse import Namespace
+
+import pytest
+from requests_cache import CachedSession
+
+from src import configs, main, utils
+from src.snapshot import Snapshot, SnapshotWriter
+from tests.fixture_data.pages import DOCS_ARCHIVES
+from tests.fixture_data.server import serve, site_pages
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = tmp_path / 'docs.snapshot'
+    pages = {f'https://example.org/{number}': b'x' * number * 100
+             for number in range(200)}
+    with SnapshotWriter(path) as writer:
+        for url, body in pages.items():
+            writer.add(url, 200, {'ETag': url}, [body])
+    snapshot = Snapshot(path)
+    for url, body in pages.items():
+        assert snapshot.read(url) == body
+        assert snapshot.find(url).headers == {'ETag': url}
+    assert snapshot.find('https://example.org/missing') is None
+    assert path.stat().st_size < sum(map(len, pages.values())) / 10
+    snapshot.close()
+
+
+def test_snapshot_rejects_foreign_file(tmp_path):
+    path = tmp_path / 'docs.snapshot'
+    path.write_bytes(b'not a snapshot at all')
+    with pytest.raises(Exception) as excinfo:
+        Snapshot(path)
+    assert excinfo.typename == 'SnapshotFormatException'
+
+
+def test_snapshot_adapter_serves_ranges(tmp_path):
+    path = tmp_path / 'docs.snapshot'
+    body = bytes(range(256)) * 1000
+    with SnapshotWriter(path) as writer:
+        writer.add('https://example.org/docs.zip', 200, {}, [body])
+    session = configs.configure_session(Namespace(from_snapshot=path))
+    response = session.get(
+        'https://example.org/docs.zip', headers={'Range': 'bytes=1000-'}
+    )
+    assert response.status_code == 206
+    assert response.content == body[1000:]
+    response = session.get(
+        'https://example.org/docs.zip',
+        headers={'Range': 'bytes=1000-', 'If-Range': '"other"'}
+    )
+    assert response.status_code == 200
+    assert response.content == body
+    assert session.head('https://example.org/docs.zip').headers[
+        'Content-Length'
+    ] == str(len(body))
+    with pytest.raises(ConnectionError):
+        utils.get_response(session, 'https://example.org/missing')
+
+
+def test_modes_run_from_snapshot(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    path = tmp_path / 'docs.snapshot'
+    cli_args = Namespace(snapshot_output=path)
+    modes = ('whats-new', 'latest-versions', 'pep')
+    with serve(site_pages(peps=20, versions=5)) as url:
+        monkeypatch.setattr(main, 'MAIN_DOC_URL', url + 'docs/3/')
+        monkeypatch.setattr(main, 'PEP_DOC_URL', url + 'peps/')
+        session = CachedSession(backend='memory')
+        online = {
+            mode: main.MODE_TO_FUNCTION[mode](session, cli_args)
+            for mode in modes
+        }
+        main.snapshot_build(session, cli_args)
+    for archive in (tmp_path / 'downloads').iterdir():
+        archive.unlink()
+    offline = configs.configure_session(Namespace(from_snapshot=path))
+    for mode in modes:
+        assert main.MODE_TO_FUNCTION[mode](offline, cli_args) == online[mode]
+    main.download(offline, Namespace(all=True))
+    assert sorted(
+        archive.name for archive in (tmp_path / 'downloads').iterdir()
+        if archive.suffix in ('.zip', '.epub')
+    ) == sorted(DOCS_ARCHIVES)
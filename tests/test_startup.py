@@ -0,0 +1,35 @@
+import subprocess
+import sys
+
+from tests.conftest import SRC_DIR
+
+STARTUP_BUDGET = 0.15
+HEAVY_MODULES = {
+    'bs4', 'lxml', 'prettytable', 'pyarrow', 'requests', 'requests_cache',
+    'tqdm', 'urllib3',
+}
+
+
+def import_times(*args):
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', *args],
+        cwd=SRC_DIR, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '[us]' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative) / 10 ** 6
+    return times
+
+
+def test_help_does_not_import_heavy_modules():
+    imported = {name.split('.')[0] for name in import_times('main.py', '-h')}
+    assert not imported & HEAVY_MODULES
+
+
+def test_import_main_within_budget():
+    runs = [import_times('-c', 'import main') for _ in range(3)]
+    assert not {name.split('.')[0] for name in runs[0]} & HEAVY_MODULES
+    assert min(times['main'] for times in runs) < STARTUP_BUDGET
@@ -0,0 +1,27 @@
+import threading
+
+from src import state
+
+
+def test_concurrent_saves_keep_state_file_whole(tmp_path):
+    path = tmp_path / 'states' / 'pep.json'
+    errors = []
+
+    def save_many(number):
+        try:
+            for _ in range(200):
+                state.save_state({str(number): 'x' * 1000}, path)
+                state.load_state(path)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [
+        threading.Thread(target=save_many, args=(number,))
+        for number in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(state.load_state(path)) == 1
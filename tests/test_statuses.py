@@ -0,0 +1,72 @@
+import logging
+from argparse import Namespace
+
+from requests_cache import CachedSession
+
+from src import main
+from src.main import PepRow
+from src.statuses import StatusMismatch, intern_codes, reconcile
+from tests.fixture_data.pages import pep_card_page
+
+
+def pep_row(number, abbr):
+    return PepRow(number, abbr, f'pep-{number:04d}/', '')
+
+
+def test_intern_codes():
+    table, codes = intern_codes(['Final', 'Draft', 'Final', 'Active'])
+    assert table == ['Final', 'Draft', 'Active']
+    assert list(codes) == [0, 1, 0, 2]
+
+
+def test_reconcile_counts_and_mismatches():
+    counts, mismatches = reconcile(
+        [pep_row(1, 'A'), pep_row(2, 'F'), pep_row(3, 'F'),
+         pep_row(4, ''), pep_row(5, 'X')],
+        ['Active', 'Final', 'Rejected', 'Draft', 'Final']
+    )
+    assert list(counts.items()) == [
+        ('Active', 1), ('Final', 2), ('Rejected', 1), ('Draft', 1)
+    ]
+    assert mismatches == [
+        StatusMismatch(3, 'pep-0003/', ('Final',), 'Rejected'),
+        StatusMismatch(5, 'pep-0005/', (), 'Final'),
+    ]
+
+
+def test_reconcile_many_distinct_statuses():
+    statuses = [f'Status {number}' for number in range(300)] + ['Final']
+    rows = [pep_row(number, 'F') for number in range(len(statuses))]
+    table, codes = intern_codes(statuses)
+    assert len(table) == 301 and codes[-1] == 300
+    counts, mismatches = reconcile(rows, statuses)
+    assert len(counts) == 301
+    assert [mismatch.number for mismatch in mismatches] == list(range(300))
+
+
+def test_reconcile_many_rows():
+    numbers = range(100000)
+    counts, mismatches = reconcile(
+        [pep_row(number, 'W') for number in numbers],
+        ['Withdrawn' if number % 1000 else 'Final' for number in numbers]
+    )
+    assert counts == {'Final': 100, 'Withdrawn': 99900}
+    assert [mismatch.number for mismatch in mismatches] == list(
+        range(0, 100000, 1000)
+    )
+
+
+def test_pep_reports_mismatches_once(caplog, pep_server):
+    with pep_server(10) as (_, pages):
+        pages['/pep-0003/'] = pep_card_page(3, 'Final').encode()
+        pages['/pep-0004/'] = pep_card_page(4, 'Final').encode()
+        with caplog.at_level(logging.WARNING):
+            main.pep(CachedSession(backend='memory'), Namespace())
+    warnings = [
+        record.getMessage() for record in caplog.records
+        if record.levelno == logging.WARNING
+    ]
+    assert len(warnings) == 1
+    assert 'всего 2' in warnings[0]
+    assert 'PEP 3: ожидался Withdrawn, в карточке Final' in warnings[0]
+    assert 'PEP 4: ожидался Deferred, в карточке Final' in warnings[0]
@@ -1,8 +1,15 @@
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 import requests
 import requests_mock
 import bs4
 from conftest import MAIN_DOC_URL
+from requests_cache import CachedSession
+
+from tests.fixture_data.server import pep_pages, serve
 try:
     from src import utils
 except ModuleNotFoundError:
@@ -54,3 +61,92 @@ def test_get_response(mock_session):
             'делает запрос к странице и возвращает ответ. \n'
             'Кстати: You are breathtaken!'
         )
+
+
+@pytest.mark.parametrize('url, expected', [
+    ('HTTPS://Peps.Python.org', 'https://peps.python.org/'),
+    ('https://peps.python.org:443/pep-0008/#id1',
+     'https://peps.python.org/pep-0008/'),
+    ('http://127.0.0.1:8080/docs/3/../3/./index.html?q=1',
+     'http://127.0.0.1:8080/docs/3/index.html?q=1'),
+])
+def test_normalize_url(url, expected):
+    assert utils.normalize_url(url) == expected
+
+
+def tag_names(soup):
+    return [tag.name for tag in soup.find_all(True)]
+
+
+def test_concurrent_requests_share_one_fetch(monkeypatch):
+    monkeypatch.setattr(utils, 'coalesced_stats', Counter())
+    session = CachedSession(backend='memory')
+    sent = {}
+    with serve(pep_pages(1), delay=0.2, sent=sent) as url:
+        urls = [url + 'pep-0001/', url.upper() + 'x/../pep-0001/#top']
+        with ThreadPoolExecutor(8) as executor:
+            records = list(executor.map(
+                lambda page: utils.fetch_and_extract(session, page, tag_names),
+                urls * 4
+            ))
+    assert sent == {'/pep-0001/': 1}
+    assert len({id(record) for record in records}) == 1
+    assert utils.coalesced_stats['fetch_and_extract'] == 7
+
+
+def test_single_flight_shares_errors(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    followers_joined = threading.Event()
+
+    class JoinedStats(Counter):
+        def __setitem__(self, key, value):
+            super().__setitem__(key, value)
+            if value >= 3:
+                followers_joined.set()
+
+    monkeypatch.setattr(utils, 'coalesced_stats', JoinedStats())
+    flight = utils.SingleFlight('test')
+    calls = []
+
+    def load():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        raise ValueError('boom')
+
+    errors = []
+
+    def call():
+        try:
+            flight.do('key', load)
+        except ValueError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    assert started.wait(5)
+    followers = [threading.Thread(target=call) for _ in range(3)]
+    for follower in followers:
+        follower.start()
+    assert followers_joined.wait(5)
+    release.set()
+    for thread in (leader, *followers):
+        thread.join(5)
+    assert len(calls) == 1 and len(errors) == 4
+    assert not flight.flights
+
+
+def test_fetch_and_extract_releases_tree(mock_session):
+    soups = []
+
+    def extract(soup):
+        soups.append(soup)
+        return soup.find('h1').get_text()
+
+    with requests_mock.Mocker() as mock:
+        mock.get(MAIN_DOC_URL + 'page/', text='<h1>Title</h1>')
+        got = utils.fetch_and_extract(
+            mock_session, MAIN_DOC_URL + 'page/', extract
+        )
+    assert got == 'Title' and type(got) is str
+    assert soups[0].decomposed